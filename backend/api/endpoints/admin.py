@@ -24,6 +24,7 @@ from sqlalchemy import text
 from sqlalchemy.orm import Session
 
 from api.dependencies.admin_auth import verify_admin_key
+from api.endpoints.tiles import clear_tile_cache
 from core.catchment_graph import get_catchment_graph
 from core.database import get_db, get_db_engine
 
@@ -383,6 +384,7 @@ def _execute_cleanup_target(
             table_list = ", ".join(_TABLE_NAMES)
             db.execute(text(f"TRUNCATE TABLE {table_list} CASCADE"))  # noqa: S608 — table names from hardcoded _TABLE_NAMES, not user input
             db.commit()
+            clear_tile_cache()
             return {"key": target_key, "status": "ok"}
 
         return {"key": target_key, "status": "error", "detail": "unknown type"}
@@ -465,6 +467,8 @@ def _read_process_output(process: subprocess.Popen, state: dict) -> None:
     finally:
         process.wait()
         state["process"] = None
+        # The pipeline rewrites the tile source tables (even when it fails)
+        clear_tile_cache()
         if process.returncode == 0:
             state["status"] = "completed"
         else:
@@ -6,10 +6,11 @@ by sampling the DEM raster file via rasterio.
 """
 
 import logging
-import math
 import os
 
+import numpy as np
 import rasterio
+import shapely
 from fastapi import APIRouter, HTTPException, Response
 from pyproj import Transformer
 from shapely.geometry import LineString
@@ -69,14 +70,12 @@ def terrain_profile(
         line = LineString(coords_2180)
         total_length_m = line.length
 
-        # Generate sample points along the line
-        sample_points = []
-        distances = []
-        for i in range(n_samples):
-            frac = i / max(n_samples - 1, 1)
-            point = line.interpolate(frac, normalized=True)
-            sample_points.append((point.x, point.y))
-            distances.append(frac * total_length_m)
+        # Sample points along the line, interpolated in one vectorized call
+        fractions = np.linspace(0.0, 1.0, n_samples)
+        sample_xy = shapely.get_coordinates(
+            shapely.line_interpolate_point(line, fractions, normalized=True)
+        )
+        distances = (fractions * total_length_m).tolist()
 
         # Read elevations from DEM file
         settings = get_settings()
@@ -89,18 +88,23 @@ def terrain_profile(
                 detail="Plik DEM nie jest dostepny. Skontaktuj sie z administratorem.",
             )
 
-        elevations: list[float] = []
-        nodata_count = 0
         with rasterio.open(dem_path) as dataset:
-            for val in dataset.sample(sample_points):
-                elev = float(val[0])
-                if dataset.nodata is not None and math.isclose(
-                    elev, float(dataset.nodata), rel_tol=1e-6
-                ):
-                    elevations.append(0.0)
-                    nodata_count += 1
-                else:
-                    elevations.append(elev)
+            # One sample() call for the whole (N, 2) array of points
+            values = np.fromiter(
+                (val[0] for val in dataset.sample(sample_xy)),
+                dtype=np.float64,
+                count=n_samples,
+            )
+            if dataset.nodata is not None:
+                nodata_mask = np.isclose(
+                    values, float(dataset.nodata), rtol=1e-6, atol=0.0
+                )
+            else:
+                nodata_mask = np.zeros(n_samples, dtype=bool)
+
+        nodata_count = int(nodata_mask.sum())
+        # DEM is float32 (~cm precision); extra digits are noise
+        elevations = np.where(nodata_mask, 0.0, values.round(2)).tolist()
 
         if not elevations or nodata_count == len(elevations):
             raise HTTPException(
@@ -9,11 +9,23 @@ No additional simplification is applied at query time — ST_AsMVTGeom
 handles coordinate quantization to the 4096-unit tile grid, which
 provides zoom-appropriate detail reduction without discrete visual
 jumps between zoom levels.
+
+Rendered tiles are kept in an in-process TTL cache keyed by
+(layer, z, x, y, threshold), so a hot tile costs one ST_AsMVT query
+per TTL window instead of one per request. Larger tiles are cached
+gzip-compressed as well, so compression also runs once per cache fill.
+Each tile carries a content-hash ETag, so clients revalidate with a
+bodyless 304.
 """
 
+import gzip
+import hashlib
 import logging
+import threading
+from typing import NamedTuple
 
-from fastapi import APIRouter, Depends, Query, Response
+from cachetools import TTLCache
+from fastapi import APIRouter, Depends, Header, Query, Response
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
@@ -24,6 +36,145 @@ router = APIRouter()
 
 _EMPTY_MVT = b""
 
+# Tile URLs carry no data version, so no "immutable": after reprocessing,
+# clients pick up new tiles within a day via ETag revalidation
+_TILE_CACHE_CONTROL = "public, max-age=86400, stale-while-revalidate=86400"
+
+# Tiles at least this large are also cached gzip-compressed (matches the
+# GZipMiddleware minimum_size in api.main)
+_GZIP_MIN_SIZE = 500
+_GZIP_LEVEL = 6
+
+# Tile cache budget in bytes of MVT payload; TTL bounds staleness after the
+# pipeline rewrites the tables from another process
+TILE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+TILE_CACHE_TTL_S = 3600
+# Rough per-entry overhead (key tuple + dict slot), so empty tiles count too
+_TILE_ENTRY_OVERHEAD = 256
+
+
+class _CachedTile(NamedTuple):
+    """Rendered tile with its optional gzip encoding and quoted ETag."""
+
+    data: bytes
+    gzip_data: bytes | None
+    etag: str
+
+
+def _tile_size(tile: _CachedTile) -> int:
+    """Cache weight of a tile: payload bytes of both encodings plus overhead."""
+    gzip_len = len(tile.gzip_data) if tile.gzip_data is not None else 0
+    return len(tile.data) + gzip_len + _TILE_ENTRY_OVERHEAD
+
+
+# Per-process: clear_tile_cache() only empties the cache of the worker that
+# runs it. With several uvicorn workers (docker-compose.prod.yml runs 2),
+# the others keep serving pre-cleanup tiles until their entries expire,
+# i.e. for up to TILE_CACHE_TTL_S.
+_tile_cache: TTLCache = TTLCache(
+    maxsize=TILE_CACHE_MAX_BYTES,
+    ttl=TILE_CACHE_TTL_S,
+    getsizeof=_tile_size,
+)
+_tile_cache_lock = threading.Lock()
+
+
+def clear_tile_cache() -> None:
+    """Drop all cached tiles (call after the source tables change)."""
+    with _tile_cache_lock:
+        _tile_cache.clear()
+
+
+def _render_tile(db: Session, key: tuple, query, params: dict) -> _CachedTile:
+    """
+    Return the MVT for ``key``, querying the database only on a cache miss.
+
+    Parameters
+    ----------
+    db : Session
+        Database session
+    key : tuple
+        Cache key: (layer, z, x, y, threshold)
+    query : TextClause
+        ST_AsMVT query returning the tile in its first column
+    params : dict
+        Bind parameters for ``query``
+
+    Returns
+    -------
+    _CachedTile
+        Tile payload (empty when no features intersect the tile), its
+        gzip encoding (None for small tiles) and its quoted ETag
+    """
+    with _tile_cache_lock:
+        tile = _tile_cache.get(key)
+    if tile is not None:
+        return tile
+
+    row = db.execute(query, params).fetchone()
+    # psycopg2 returns bytea as memoryview; copy it to bytes once per cache
+    # fill (older Starlette only accepts bytes). bytes(b) returns b itself.
+    tile_data = bytes(row[0]) if row and row[0] else _EMPTY_MVT
+    gzip_data = (
+        gzip.compress(tile_data, compresslevel=_GZIP_LEVEL, mtime=0)
+        if len(tile_data) >= _GZIP_MIN_SIZE
+        else None
+    )
+    etag = f'"{hashlib.blake2b(tile_data, digest_size=8).hexdigest()}"'
+
+    tile = _CachedTile(tile_data, gzip_data, etag)
+    with _tile_cache_lock:
+        _tile_cache[key] = tile
+    return tile
+
+
+def _etag_matches(etag: str, if_none_match: str | None) -> bool:
+    """
+    Check ``If-None-Match`` against ``etag`` using weak comparison.
+
+    RFC 9110 requires weak comparison here: a proxy that compresses the
+    tile (nginx gzips application/x-protobuf) weakens the ETag to
+    ``W/"..."``, and the client sends that form back. ``*`` matches any
+    current representation.
+    """
+    if if_none_match is None:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def _tile_response(
+    tile: _CachedTile, if_none_match: str | None, accept_encoding: str | None
+) -> Response:
+    """
+    Build the MVT response, or a bodyless 304 if the client's copy matches.
+
+    Clients accepting gzip get the pre-compressed payload, which
+    GZipMiddleware passes through untouched (Content-Encoding is set).
+    Each encoding has its own ETag, as required for strong validators.
+    """
+    use_gzip = tile.gzip_data is not None and "gzip" in (accept_encoding or "")
+    etag = tile.etag[:-1] + '-gzip"' if use_gzip else tile.etag
+    headers = {"Cache-Control": _TILE_CACHE_CONTROL, "ETag": etag}
+    not_modified = _etag_matches(etag, if_none_match)
+    # Only tiles with a gzip copy vary by encoding. Set Vary on every
+    # variant: GZipMiddleware skips pre-compressed and empty 304 bodies,
+    # and older Starlette does not add Vary to identity bodies either.
+    if tile.gzip_data is not None:
+        headers["Vary"] = "Accept-Encoding"
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+    return Response(
+        content=tile.gzip_data if use_gzip else tile.data,
+        media_type="application/x-protobuf",
+        headers=headers,
+    )
+
 
 def _tile_to_bbox_3857(z: int, x: int, y: int):
     """Convert XYZ tile coordinates to EPSG:3857 bounding box."""
@@ -44,6 +195,8 @@ def get_streams_mvt(
     x: int,
     y: int,
     threshold: int = Query(default=100000, ge=1, description="FA threshold in m²"),
+    if_none_match: str | None = Header(default=None),
+    accept_encoding: str | None = Header(default=None),
     db: Session = Depends(get_db),
 ) -> Response:
     """
@@ -54,7 +207,9 @@ def get_streams_mvt(
     """
     xmin, ymin, xmax, ymax = _tile_to_bbox_3857(z, x, y)
 
-    row = db.execute(
+    tile = _render_tile(
+        db,
+        ("streams", z, x, y, threshold),
         text("""
         WITH mvt_data AS (
             SELECT
@@ -87,16 +242,10 @@ def get_streams_mvt(
             "ymax": ymax,
             "threshold": threshold,
         },
-    ).fetchone()
-
-    tile_data = row[0] if row and row[0] else _EMPTY_MVT
-
-    return Response(
-        content=bytes(tile_data),
-        media_type="application/x-protobuf",
-        headers={"Cache-Control": "public, max-age=86400"},
     )
 
+    return _tile_response(tile, if_none_match, accept_encoding)
+
 
 @router.get("/tiles/catchments/{z}/{x}/{y}.pbf")
 def get_catchments_mvt(
@@ -104,6 +253,8 @@ def get_catchments_mvt(
     x: int,
     y: int,
     threshold: int = Query(default=100000, ge=1, description="FA threshold in m²"),
+    if_none_match: str | None = Header(default=None),
+    accept_encoding: str | None = Header(default=None),
     db: Session = Depends(get_db),
 ) -> Response:
     """
@@ -118,7 +269,9 @@ def get_catchments_mvt(
     # Min polygon area to include in tiles (filters raster micro-fragments)
     min_geom_area = 50  # m² in EPSG:2180
 
-    row = db.execute(
+    tile = _render_tile(
+        db,
+        ("catchments", z, x, y, threshold),
         text("""
         WITH mvt_data AS (
             SELECT
@@ -154,22 +307,18 @@ def get_catchments_mvt(
             "threshold": threshold,
             "min_geom_area": min_geom_area,
         },
-    ).fetchone()
-
-    tile_data = row[0] if row and row[0] else _EMPTY_MVT
-
-    return Response(
-        content=bytes(tile_data),
-        media_type="application/x-protobuf",
-        headers={"Cache-Control": "public, max-age=86400"},
     )
 
+    return _tile_response(tile, if_none_match, accept_encoding)
+
 
 @router.get("/tiles/landcover/{z}/{x}/{y}.pbf")
 def get_landcover_tile(
     z: int,
     x: int,
     y: int,
+    if_none_match: str | None = Header(default=None),
+    accept_encoding: str | None = Header(default=None),
     db: Session = Depends(get_db),
 ) -> Response:
     """
@@ -180,7 +329,9 @@ def get_landcover_tile(
     """
     xmin, ymin, xmax, ymax = _tile_to_bbox_3857(z, x, y)
 
-    row = db.execute(
+    tile = _render_tile(
+        db,
+        ("landcover", z, x, y, None),
         text("""
         WITH mvt_data AS (
             SELECT
@@ -211,16 +362,10 @@ def get_landcover_tile(
             "xmax": xmax,
             "ymax": ymax,
         },
-    ).fetchone()
-
-    tile_data = row[0] if row and row[0] else _EMPTY_MVT
-
-    return Response(
-        content=bytes(tile_data),
-        media_type="application/x-protobuf",
-        headers={"Cache-Control": "public, max-age=86400"},
     )
 
+    return _tile_response(tile, if_none_match, accept_encoding)
+
 
 @router.get("/tiles/thresholds")
 def get_available_thresholds(db: Session = Depends(get_db)) -> dict:
@@ -14,6 +14,7 @@ from sqlalchemy.orm import Session
 
 from core.catchment_graph import get_catchment_graph
 from core.constants import (
+    BOUNDARY_DISPLAY_SIMPLIFY_M,
     DEFAULT_THRESHOLD_M2,
     DELINEATION_MAX_AREA_M2,
     HYDROGRAPH_AREA_LIMIT_KM2,
@@ -201,8 +202,11 @@ def delineate_watershed(
         # 9. Extract largest polygon from MultiPolygon
         boundary_poly = boundary_to_polygon(boundary_2180)
 
-        # 10. Transform boundary to WGS84 + GeoJSON
-        boundary_wgs84 = transform_polygon_pl1992_to_wgs84(boundary_poly)
+        # 10. Simplify for display, transform boundary to WGS84 + GeoJSON
+        display_poly = boundary_poly.simplify(
+            BOUNDARY_DISPLAY_SIMPLIFY_M, preserve_topology=True
+        )
+        boundary_wgs84 = transform_polygon_pl1992_to_wgs84(display_poly)
         boundary_geojson = polygon_to_geojson_feature(
             boundary_wgs84,
             properties={"area_km2": round(area_km2, 2)},
@@ -25,5 +25,9 @@ MAX_STREAM_DISTANCE_M = 1000.0
 # Default flow accumulation threshold (finest resolution)
 DEFAULT_THRESHOLD_M2 = 1000
 
+# Display-only simplification of watershed boundaries sent as GeoJSON
+# (the smoothed ST_Union output is dense; stats use the full geometry)
+BOUNDARY_DISPLAY_SIMPLIFY_M = 1.0
+
 # Delineation area limit — above this, auto-switch to selection display
 DELINEATION_MAX_AREA_M2 = 10_000  # 0.01 km²
@@ -5,6 +5,7 @@ Provides mock database sessions, sample data, and common fixtures
 used across unit and integration tests.
 """
 
+from contextlib import asynccontextmanager
 from unittest.mock import MagicMock
 
 import pytest
@@ -12,6 +13,36 @@ import pytest
 from core.watershed import FlowCell
 
 
+@asynccontextmanager
+async def _no_lifespan(_app):
+    """Lifespan that skips startup work (catchment graph load from the DB)."""
+    yield
+
+
+@pytest.fixture(scope="session")
+def client():
+    """
+    Create test client shared by the whole test session.
+
+    The app lifespan is disabled: tests patch ``get_catchment_graph``
+    themselves, so loading the real graph only costs a DB round trip.
+    Entering the client keeps one event-loop portal open for the whole
+    session, so requests do not start a new loop each time.
+    Modules that define their own ``client`` fixture override this one.
+
+    The app is imported here, not at module level, so unit tests that
+    never request ``client`` collect without the API's dependencies.
+    """
+    from fastapi.testclient import TestClient
+
+    from api.main import app
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(app.router, "lifespan_context", _no_lifespan)
+        with TestClient(app) as c:
+            yield c
+
+
 @pytest.fixture
 def mock_db():
     """Create mock database session."""
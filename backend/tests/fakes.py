@@ -0,0 +1,129 @@
+"""
+Plain-Python test doubles shared by the endpoint tests.
+
+Cheaper than MagicMock (no child mocks or call recording) and
+stateless apart from memoization, so one instance can serve a module.
+"""
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from types import ModuleType
+from typing import Any
+
+import numpy as np
+import pytest
+
+
+@dataclass(frozen=True, slots=True)
+class FakeResult:
+    """Minimal stand-in for a SQLAlchemy ``Result``."""
+
+    row: Any = None
+    rows: tuple = ()
+
+    def fetchone(self):
+        return self.row
+
+    def fetchall(self):
+        return list(self.rows)
+
+
+EMPTY_RESULT = FakeResult()
+
+
+class FakeSession:
+    """
+    DB session answering queries from a dispatch table.
+
+    ``dispatch`` holds ``(substrings, result)`` pairs: the first entry
+    whose substrings all occur in the SQL wins, anything else returns no
+    rows. An exception in place of a result is raised instead.
+    """
+
+    __slots__ = ("_dispatch", "_memo")
+
+    def __init__(
+        self,
+        dispatch: Sequence[tuple[tuple[str, ...], FakeResult | Exception]] = (),
+    ):
+        self._dispatch = dispatch
+        # SQL text -> result, so each statement is scanned only once
+        self._memo: dict[str, FakeResult | Exception] = {}
+
+    def execute(self, query, params=None):
+        # Read the raw SQL of TextClause instead of compiling it via str()
+        sql = getattr(query, "text", None) or str(query)
+        result = self._memo.get(sql)
+        if result is None:
+            result = next(
+                (r for keys, r in self._dispatch if all(k in sql for k in keys)),
+                EMPTY_RESULT,
+            )
+            self._memo[sql] = result
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+# Upstream node indices returned by FakeCG.traverse_upstream (read-only)
+_UPSTREAM = np.array([0, 1, 2], dtype=np.int64)
+_UPSTREAM.setflags(write=False)
+
+
+class FakeCG:
+    """
+    Stand-in for CatchmentGraph with a fixed three-node upstream traversal.
+
+    Implements only the methods the delineation endpoints call;
+    ``aggregate_stats`` returns ``stats`` for any set of nodes.
+    """
+
+    __slots__ = ("loaded", "_stats", "_segment_idx")
+
+    def __init__(self, stats: dict | None = None, segment_idx: int = 10):
+        self.loaded = True
+        self._stats = stats
+        self._segment_idx = segment_idx
+
+    def find_catchment_at_point(self, x, y, threshold_m2, db):
+        return 0
+
+    def get_segment_idx(self, idx):
+        return self._segment_idx
+
+    def traverse_upstream(self, idx):
+        return _UPSTREAM
+
+    def get_segment_indices(self, indices, threshold_m2):
+        # A tuple, so no caller can mutate the shared result
+        return (10, 11, 12)
+
+    def aggregate_stats(self, indices):
+        return self._stats
+
+    def aggregate_hypsometric(self, indices):
+        return []
+
+
+class NoCatchmentCG(FakeCG):
+    """CatchmentGraph stand-in with no sub-catchment at the clicked point."""
+
+    __slots__ = ()
+
+    def find_catchment_at_point(self, x, y, threshold_m2, db):
+        raise ValueError("Nie znaleziono zlewni cząstkowej")
+
+
+def returning(value):
+    """Build a stand-in function that ignores its arguments."""
+
+    def _fn(*args, **kwargs):
+        return value
+
+    return _fn
+
+
+def apply_patches(mp: pytest.MonkeyPatch, module: ModuleType, patches: dict) -> None:
+    """Install ``patches`` (attribute name -> replacement) on ``module``."""
+    for name, value in patches.items():
+        mp.setattr(module, name, value)
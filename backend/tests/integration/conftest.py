@@ -0,0 +1,51 @@
+"""
+Shared fixtures for integration tests.
+
+Resets FastAPI dependency overrides after every test; the session-wide
+TestClient lives in tests/conftest.py.
+"""
+
+from contextlib import contextmanager
+
+import pytest
+
+from api.main import app
+from core.database import get_db
+
+
+def _set_db(db) -> None:
+    """Make ``get_db`` return ``db``."""
+    app.dependency_overrides[get_db] = lambda: db
+
+
+@contextmanager
+def _db_overridden(db):
+    """Make ``get_db`` return ``db`` inside the block only."""
+    _set_db(db)
+    try:
+        yield db
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+
+
+@pytest.fixture(autouse=True)
+def override_db():
+    """
+    Yield a setter that makes ``get_db`` return the given session.
+
+    Clears ``app.dependency_overrides`` after each test, even when an
+    assertion fails midway.
+    """
+    yield _set_db
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture(scope="session")
+def override_db_context():
+    """
+    Return a context manager that overrides ``get_db`` for one block.
+
+    For module-scoped fixtures, which cannot use the function-scoped
+    ``override_db``: ``with override_db_context(db): ...``.
+    """
+    return _db_overridden
@@ -5,16 +5,24 @@ Integration tests for depressions (blue spots) endpoint.
 from unittest.mock import MagicMock
 
 import pytest
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
-from api.main import app
+from api.endpoints import depressions
 from core.database import get_db
 
 
-@pytest.fixture
-def client():
-    """Create test client."""
-    return TestClient(app)
+def _make_app(db) -> FastAPI:
+    """
+    Build a per-test app serving only the depressions router.
+
+    Overrides live on this app instead of the global ``api.main.app``,
+    so tests never share mutable state and can run in parallel.
+    """
+    test_app = FastAPI()
+    test_app.include_router(depressions.router, prefix="/api")
+    test_app.dependency_overrides[get_db] = lambda: db
+    return test_app
 
 
 def _make_depression_row(
@@ -61,60 +69,58 @@ def mock_db_no_depressions():
     return mock_session
 
 
+@pytest.fixture
+def isolated_client(mock_db_with_depressions):
+    """Test client bound to an isolated app with depression features."""
+    with TestClient(_make_app(mock_db_with_depressions)) as c:
+        yield c
+
+
+@pytest.fixture
+def empty_client(mock_db_no_depressions):
+    """Test client bound to an isolated app with no depressions."""
+    with TestClient(_make_app(mock_db_no_depressions)) as c:
+        yield c
+
+
 class TestDepressionsEndpoint:
     """Tests for GET /api/depressions."""
 
-    def test_success_returns_200(self, client, mock_db_with_depressions):
+    def test_success_returns_200(self, isolated_client):
         """Test successful request returns 200."""
-        app.dependency_overrides[get_db] = lambda: mock_db_with_depressions
-
-        response = client.get("/api/depressions")
+        response = isolated_client.get("/api/depressions")
 
         assert response.status_code == 200
-        app.dependency_overrides.clear()
 
-    def test_response_is_geojson_feature_collection(
-        self, client, mock_db_with_depressions
-    ):
+    def test_response_is_geojson_feature_collection(self, isolated_client):
         """Test response is a valid GeoJSON FeatureCollection."""
-        app.dependency_overrides[get_db] = lambda: mock_db_with_depressions
-
-        response = client.get("/api/depressions")
+        response = isolated_client.get("/api/depressions")
         data = response.json()
 
         assert data["type"] == "FeatureCollection"
         assert "features" in data
         assert isinstance(data["features"], list)
-        app.dependency_overrides.clear()
 
-    def test_feature_count(self, client, mock_db_with_depressions):
+    def test_feature_count(self, isolated_client):
         """Test correct number of features returned."""
-        app.dependency_overrides[get_db] = lambda: mock_db_with_depressions
-
-        response = client.get("/api/depressions")
+        response = isolated_client.get("/api/depressions")
         data = response.json()
 
         assert len(data["features"]) == 3
-        app.dependency_overrides.clear()
 
-    def test_feature_structure(self, client, mock_db_with_depressions):
+    def test_feature_structure(self, isolated_client):
         """Test each feature has correct GeoJSON structure."""
-        app.dependency_overrides[get_db] = lambda: mock_db_with_depressions
-
-        response = client.get("/api/depressions")
+        response = isolated_client.get("/api/depressions")
         data = response.json()
 
         for feature in data["features"]:
             assert feature["type"] == "Feature"
             assert "geometry" in feature
             assert "properties" in feature
-        app.dependency_overrides.clear()
 
-    def test_feature_properties(self, client, mock_db_with_depressions):
+    def test_feature_properties(self, isolated_client):
         """Test feature properties contain required fields."""
-        app.dependency_overrides[get_db] = lambda: mock_db_with_depressions
-
-        response = client.get("/api/depressions")
+        response = isolated_client.get("/api/depressions")
         data = response.json()
 
         props = data["features"][0]["properties"]
@@ -123,95 +129,69 @@ class TestDepressionsEndpoint:
         assert "area_m2" in props
         assert "max_depth_m" in props
         assert "mean_depth_m" in props
-        app.dependency_overrides.clear()
 
-    def test_empty_result_returns_empty_collection(
-        self, client, mock_db_no_depressions
-    ):
+    def test_empty_result_returns_empty_collection(self, empty_client):
         """Test empty result returns FeatureCollection with no features."""
-        app.dependency_overrides[get_db] = lambda: mock_db_no_depressions
-
-        response = client.get("/api/depressions")
+        response = empty_client.get("/api/depressions")
         data = response.json()
 
         assert response.status_code == 200
         assert data["type"] == "FeatureCollection"
         assert len(data["features"]) == 0
-        app.dependency_overrides.clear()
 
-    def test_min_volume_filter(self, client, mock_db_with_depressions):
+    def test_min_volume_filter(self, isolated_client):
         """Test min_volume query parameter is accepted."""
-        app.dependency_overrides[get_db] = lambda: mock_db_with_depressions
-
-        response = client.get("/api/depressions?min_volume=100")
+        response = isolated_client.get("/api/depressions?min_volume=100")
 
         assert response.status_code == 200
-        app.dependency_overrides.clear()
 
-    def test_max_volume_filter(self, client, mock_db_with_depressions):
+    def test_max_volume_filter(self, isolated_client):
         """Test max_volume query parameter is accepted."""
-        app.dependency_overrides[get_db] = lambda: mock_db_with_depressions
-
-        response = client.get("/api/depressions?max_volume=1000")
+        response = isolated_client.get("/api/depressions?max_volume=1000")
 
         assert response.status_code == 200
-        app.dependency_overrides.clear()
 
-    def test_min_area_filter(self, client, mock_db_with_depressions):
+    def test_min_area_filter(self, isolated_client):
         """Test min_area query parameter is accepted."""
-        app.dependency_overrides[get_db] = lambda: mock_db_with_depressions
-
-        response = client.get("/api/depressions?min_area=10")
+        response = isolated_client.get("/api/depressions?min_area=10")
 
         assert response.status_code == 200
-        app.dependency_overrides.clear()
 
-    def test_max_area_filter(self, client, mock_db_with_depressions):
+    def test_max_area_filter(self, isolated_client):
         """Test max_area query parameter is accepted."""
-        app.dependency_overrides[get_db] = lambda: mock_db_with_depressions
-
-        response = client.get("/api/depressions?max_area=500")
+        response = isolated_client.get("/api/depressions?max_area=500")
 
         assert response.status_code == 200
-        app.dependency_overrides.clear()
 
-    def test_combined_filters(self, client, mock_db_with_depressions):
+    def test_combined_filters(self, isolated_client):
         """Test combining volume and area filters."""
-        app.dependency_overrides[get_db] = lambda: mock_db_with_depressions
-
-        response = client.get(
+        response = isolated_client.get(
             "/api/depressions?min_volume=10&max_volume=1000&min_area=5&max_area=500"
         )
 
         assert response.status_code == 200
-        app.dependency_overrides.clear()
 
-    def test_bbox_filter(self, client, mock_db_with_depressions):
+    def test_bbox_filter(self, isolated_client):
         """Test bbox query parameter is accepted."""
-        app.dependency_overrides[get_db] = lambda: mock_db_with_depressions
-
-        response = client.get("/api/depressions?bbox=20.9,51.9,21.1,52.1")
+        response = isolated_client.get("/api/depressions?bbox=20.9,51.9,21.1,52.1")
 
         assert response.status_code == 200
-        app.dependency_overrides.clear()
 
-    def test_negative_min_volume_returns_422(self, client):
+    def test_negative_min_volume_returns_422(self, isolated_client):
         """Test that negative min_volume returns 422."""
-        response = client.get("/api/depressions?min_volume=-10")
+        response = isolated_client.get("/api/depressions?min_volume=-10")
 
         assert response.status_code == 422
 
-    def test_negative_min_area_returns_422(self, client):
+    def test_negative_min_area_returns_422(self, isolated_client):
         """Test that negative min_area returns 422."""
-        response = client.get("/api/depressions?min_area=-5")
+        response = isolated_client.get("/api/depressions?min_area=-5")
 
         assert response.status_code == 422
 
-    def test_values_are_rounded(self, client, mock_db_with_depressions):
+    def test_values_are_rounded(self, isolated_client):
         """Test that property values are properly rounded."""
-        app.dependency_overrides[get_db] = lambda: mock_db_with_depressions
-
-        response = client.get("/api/depressions")
+        response = isolated_client.get("/api/depressions")
         data = response.json()
 
         props = data["features"][0]["properties"]
@@ -221,26 +201,31 @@ class TestDepressionsEndpoint:
         assert isinstance(props["area_m2"], float)
         # max_depth_m rounded to 3 decimal places
         assert isinstance(props["max_depth_m"], float)
-        app.dependency_overrides.clear()
 
-    def test_features_ordered_by_volume_desc(self, client, mock_db_with_depressions):
+    def test_features_ordered_by_volume_desc(self, isolated_client):
         """Test that features are ordered by volume descending (via SQL)."""
-        app.dependency_overrides[get_db] = lambda: mock_db_with_depressions
-
-        response = client.get("/api/depressions")
+        response = isolated_client.get("/api/depressions")
         data = response.json()
 
         volumes = [f["properties"]["volume_m3"] for f in data["features"]]
         assert volumes == sorted(volumes, reverse=True)
-        app.dependency_overrides.clear()
 
-    def test_invalid_bbox_format_still_returns_200(
-        self, client, mock_db_with_depressions
-    ):
+    def test_invalid_bbox_format_still_returns_200(self, isolated_client):
         """Test that invalid bbox format is silently ignored."""
-        app.dependency_overrides[get_db] = lambda: mock_db_with_depressions
+        response = isolated_client.get("/api/depressions?bbox=invalid")
+
+        assert response.status_code == 200
 
-        response = client.get("/api/depressions?bbox=invalid")
+    def test_served_by_main_app(self, client, override_db, mock_db_with_depressions):
+        """Smoke test: the full app (with its middleware) serves the endpoint."""
+        override_db(mock_db_with_depressions)
+        response = client.get(
+            "/api/depressions",
+            headers={"Origin": "http://localhost", "Accept-Encoding": "gzip"},
+        )
 
         assert response.status_code == 200
-        app.dependency_overrides.clear()
+        assert len(response.json()["features"]) == 3
+        assert response.headers["access-control-allow-origin"] == "http://localhost"
+        assert response.headers["content-encoding"] == "gzip"
+        assert len(response.headers["x-request-id"]) == 8
@@ -5,16 +5,24 @@ Integration tests for health endpoint.
 from unittest.mock import MagicMock
 
 import pytest
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
-from api.main import app
+from api.endpoints import health
 from core.database import get_db
 
 
-@pytest.fixture
-def client():
-    """Create test client."""
-    return TestClient(app)
+def _make_app(db) -> FastAPI:
+    """
+    Build a per-test app serving only the health router.
+
+    Overrides live on this app instead of the global ``api.main.app``,
+    so tests never share mutable state and can run in parallel.
+    """
+    test_app = FastAPI()
+    test_app.include_router(health.router)
+    test_app.dependency_overrides[get_db] = lambda: db
+    return test_app
 
 
 @pytest.fixture
@@ -23,54 +31,62 @@ def mock_db_session():
     return MagicMock()
 
 
-def test_health_endpoint_returns_200(client, mock_db_session):
-    """Test that health endpoint returns 200 status code."""
-    app.dependency_overrides[get_db] = lambda: mock_db_session
+@pytest.fixture
+def isolated_client(mock_db_session):
+    """Test client bound to an isolated app with a working DB session."""
+    with TestClient(_make_app(mock_db_session)) as c:
+        yield c
+
 
-    response = client.get("/health")
+def test_health_endpoint_returns_200(isolated_client):
+    """Test that health endpoint returns 200 status code."""
+    response = isolated_client.get("/health")
 
     assert response.status_code == 200
-    app.dependency_overrides.clear()
 
 
-def test_health_endpoint_response_structure(client, mock_db_session):
+def test_health_endpoint_response_structure(isolated_client):
     """Test that health response has correct structure."""
-    app.dependency_overrides[get_db] = lambda: mock_db_session
-
-    response = client.get("/health")
+    response = isolated_client.get("/health")
     data = response.json()
 
     assert "status" in data
     assert "database" in data
     assert "version" in data
-    app.dependency_overrides.clear()
 
 
-def test_health_endpoint_database_connected(client, mock_db_session):
+def test_health_endpoint_database_connected(isolated_client):
     """Test health reports connected when DB works."""
-    app.dependency_overrides[get_db] = lambda: mock_db_session
-
-    response = client.get("/health")
+    response = isolated_client.get("/health")
     data = response.json()
 
     assert data["status"] == "healthy"
     assert data["database"] == "connected"
     assert data["version"] == "1.0.0"
-    app.dependency_overrides.clear()
 
 
-def test_health_endpoint_database_error(client):
+def test_health_endpoint_database_error():
     """Test health reports error when DB fails."""
     mock_session = MagicMock()
     mock_session.execute.side_effect = Exception("Connection refused")
-    app.dependency_overrides[get_db] = lambda: mock_session
 
-    response = client.get("/health")
+    with TestClient(_make_app(mock_session)) as c:
+        response = c.get("/health")
     data = response.json()
 
     assert data["status"] == "unhealthy"
     assert "error" in data["database"]
-    app.dependency_overrides.clear()
+
+
+def test_health_through_main_app(client, override_db, mock_db_session):
+    """Smoke test: the full app (with its middleware) serves /health."""
+    override_db(mock_db_session)
+    response = client.get("/health", headers={"Origin": "http://localhost"})
+
+    assert response.status_code == 200
+    assert response.json()["database"] == "connected"
+    assert response.headers["access-control-allow-origin"] == "http://localhost"
+    assert len(response.headers["x-request-id"]) == 8
 
 
 def test_root_endpoint(client):
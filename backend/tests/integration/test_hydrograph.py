@@ -11,95 +11,99 @@ Tests the CatchmentGraph-based hydrograph endpoint by mocking:
 - DB session for precipitation query (IDW interpolation)
 """
 
-from unittest.mock import MagicMock, patch
+import asyncio
+from dataclasses import dataclass
+from types import MappingProxyType
 
+import httpx
 import numpy as np
+import orjson
 import pytest
-from fastapi.testclient import TestClient
-from shapely.geometry import MultiPolygon, Polygon
+import shapely
+from pydantic import ValidationError
+from shapely.geometry import MultiPolygon
 
+from api.endpoints import hydrograph as _hg_mod
 from api.main import app
-from core.database import get_db
-
-# Module path for patching
-_HG = "api.endpoints.hydrograph"
-
+from models.schemas import HydrographRequest
+from tests.fakes import (
+    FakeCG,
+    FakeResult,
+    FakeSession,
+    NoCatchmentCG,
+    apply_patches,
+    returning,
+)
 
 # ---------------------------------------------------------------------------
 # Shared fixtures
 # ---------------------------------------------------------------------------
 
 
-def _make_boundary() -> MultiPolygon:
-    """Create a small MultiPolygon boundary (~10 km2) in PL-1992 coords."""
-    # Approx 3.16 km x 3.16 km square -> ~10 km2
-    poly = Polygon(
-        [
-            (639000, 486000),
-            (642160, 486000),
-            (642160, 489160),
-            (639000, 489160),
-            (639000, 486000),
-        ]
-    )
-    return MultiPolygon([poly])
+# Approx 3.16 km x 3.16 km square -> ~10 km2, in PL-1992 coords
+_BOUNDARY_COORDS = np.array(
+    [
+        [639000, 486000],
+        [642160, 486000],
+        [642160, 489160],
+        [639000, 489160],
+        [639000, 486000],
+    ],
+    dtype=np.float64,
+)
+# Built once: the boundary is identical for every happy-path test
+_BOUNDARY = MultiPolygon([shapely.polygons(_BOUNDARY_COORDS)])
+
+
+# Morph dict compatible with WatershedParameters.from_dict() and the
+# MorphometricParameters schema. Shared read-only: all leaves are
+# immutable, so a shallow copy is enough before changing any value.
+_MORPH_CN75 = {
+    "area_km2": 10.0,
+    "perimeter_km": 20.0,
+    "length_km": 5.0,
+    "elevation_min_m": 120.0,
+    "elevation_max_m": 190.0,
+    "elevation_mean_m": 155.0,
+    "mean_slope_m_per_m": 0.04,
+    "channel_length_km": 6.5,
+    "channel_slope_m_per_m": 0.0108,
+    "cn": 75,
+    "source": "Hydrograf",
+    "crs": "EPSG:2180",
+    # Shape indices
+    "compactness_coefficient": None,
+    "circularity_ratio": None,
+    "elongation_ratio": None,
+    "form_factor": None,
+    "mean_width_km": None,
+    # Relief indices
+    "relief_ratio": None,
+    "hypsometric_integral": None,
+    # Drainage network indices
+    "drainage_density_km_per_km2": None,
+    "stream_frequency_per_km2": None,
+    "ruggedness_number": None,
+    "max_strahler_order": None,
+}
 
 
 def _make_morph_dict(cn: int = 75) -> dict:
-    """
-    Build a morph dict compatible with WatershedParameters.from_dict()
-    and MorphometricParameters schema.
-    """
-    return {
-        "area_km2": 10.0,
-        "perimeter_km": 20.0,
-        "length_km": 5.0,
-        "elevation_min_m": 120.0,
-        "elevation_max_m": 190.0,
-        "elevation_mean_m": 155.0,
-        "mean_slope_m_per_m": 0.04,
-        "channel_length_km": 6.5,
-        "channel_slope_m_per_m": 0.0108,
-        "cn": cn,
-        "source": "Hydrograf",
-        "crs": "EPSG:2180",
-        # Shape indices
-        "compactness_coefficient": None,
-        "circularity_ratio": None,
-        "elongation_ratio": None,
-        "form_factor": None,
-        "mean_width_km": None,
-        # Relief indices
-        "relief_ratio": None,
-        "hypsometric_integral": None,
-        # Drainage network indices
-        "drainage_density_km_per_km2": None,
-        "stream_frequency_per_km2": None,
-        "ruggedness_number": None,
-        "max_strahler_order": None,
-    }
+    """Return a shallow copy of the morph dict with the given CN."""
+    return {**_MORPH_CN75, "cn": cn}
 
 
-def _make_mock_cg():
-    """Create a mock CatchmentGraph with valid traversal results."""
-    cg = MagicMock()
-    cg.loaded = True
-    cg._segment_idx = np.array([10, 11, 12], dtype=np.int32)
-    cg.find_catchment_at_point.return_value = 0
-    cg.traverse_upstream.return_value = np.array([0, 1, 2])
-    cg.get_segment_indices.return_value = [10, 11, 12]
-    cg.aggregate_stats.return_value = {
-        "area_km2": 10.0,
-        "elevation_min_m": 120.0,
-        "elevation_max_m": 190.0,
-        "elevation_mean_m": 155.0,
-        "mean_slope_m_per_m": 0.04,
-        "stream_length_km": 6.5,
-        "drainage_density_km_per_km2": 0.65,
-        "stream_frequency_per_km2": 0.3,
-        "max_strahler_order": 3,
-    }
-    return cg
+_AGG_STATS = {
+    "area_km2": 10.0,
+    "elevation_min_m": 120.0,
+    "elevation_max_m": 190.0,
+    "elevation_mean_m": 155.0,
+    "mean_slope_m_per_m": 0.04,
+    "stream_length_km": 6.5,
+    "drainage_density_km_per_km2": 0.65,
+    "stream_frequency_per_km2": 0.3,
+    "max_strahler_order": 3,
+}
 
 
 def _make_segment_dict() -> dict:
@@ -114,309 +118,397 @@ def _make_segment_dict() -> dict:
     }
 
 
-def _make_precip_db_mock():
-    """
-    Create a mock DB session that returns precipitation = 45.0 mm
-    for any precipitation_data query.
-    """
-    mock_session = MagicMock()
+# Shared read-only payload: the endpoint never mutates it, so tests
+# must not either -- copy with dict(...) before changing any value.
+_SEGMENT = _make_segment_dict()
 
-    def execute_side_effect(query, params=None):
-        result = MagicMock()
-        query_str = str(query)
-        if "precipitation_data" in query_str:
-            precip = MagicMock()
-            precip.precipitation_interpolated = 45.0
-            result.fetchone.return_value = precip
-        else:
-            result.fetchone.return_value = None
-            result.fetchall.return_value = []
-        return result
 
-    mock_session.execute.side_effect = execute_side_effect
-    return mock_session
+@dataclass(frozen=True, slots=True)
+class _PrecipRow:
+    """Row returned by the IDW precipitation query."""
 
+    precipitation_interpolated: float
+
+
+# Returns precipitation = 45.0 mm for any precipitation_data query.
+# Stateless apart from the memo, so one instance serves the module.
+_PRECIP_DB = FakeSession(((("precipitation_data",), FakeResult(_PrecipRow(45.0))),))
+
+
+@pytest.fixture(scope="module")
+def no_stream_db():
+    """
+    DB session with no rows for any query.
+
+    Used by the 404/400 tests, which fail before any query result is read.
+    """
+    return FakeSession()
 
-@pytest.fixture
-def client():
-    """Create test client."""
-    return TestClient(app)
+
+@pytest.fixture(autouse=True)
+def _db_override(override_db):
+    """Install the precipitation DB stub (reset by the conftest)."""
+    override_db(_PRECIP_DB)
 
 
 # ---------------------------------------------------------------------------
-# Patch context manager for the "happy path" (successful generation)
+# Happy-path patches (successful generation)
 # ---------------------------------------------------------------------------
 
 
-def _patch_happy_path(cn: int = 75):
+def _patch_happy_path(cn: int = 75) -> dict:
     """
-    Return a stack of patches for a successful hydrograph generation.
+    Return replacements for a successful hydrograph generation.
 
-    Patches all 6 external functions the endpoint calls, plus the
-    DB override for precipitation.
+    Maps each of the 6 external functions the endpoint calls to a
+    stand-in; install them with ``apply_patches``.
     """
-    boundary = _make_boundary()
-    morph = _make_morph_dict(cn)
-    mock_cg = _make_mock_cg()
-    segment = _make_segment_dict()
-
-    patches = {
-        "cg": patch(f"{_HG}.get_catchment_graph", return_value=mock_cg),
-        "seg": patch(f"{_HG}.get_stream_info_by_segment_idx", return_value=segment),
-        "merge": patch(f"{_HG}.merge_catchment_boundaries", return_value=boundary),
-        "outlet": patch(
-            f"{_HG}.get_segment_outlet",
-            return_value={"x": 639139.0, "y": 486706.0},
-        ),
-        "morph": patch(f"{_HG}.build_morph_dict_from_graph", return_value=morph),
-        "lc": patch(f"{_HG}.get_land_cover_for_boundary", return_value=None),
+    morph = _MORPH_CN75 if cn == 75 else _make_morph_dict(cn)
+
+    return {
+        "get_catchment_graph": returning(FakeCG(_AGG_STATS)),
+        "get_stream_info_by_segment_idx": returning(_SEGMENT),
+        "merge_catchment_boundaries": returning(_BOUNDARY),
+        "get_segment_outlet": returning({"x": 639139.0, "y": 486706.0}),
+        "build_morph_dict_from_graph": returning(morph),
+        "get_land_cover_for_boundary": returning(None),
     }
-    return patches
 
 
-class _HappyPathContext:
-    """Context manager that activates all happy-path patches at once."""
+@pytest.fixture(scope="module")
+def happy_patches():
+    """
+    Build the happy-path replacements once per module.
 
-    def __init__(self, cn: int = 75):
-        self._patches = _patch_happy_path(cn)
-        self._mocks: dict[str, MagicMock] = {}
+    The fakes (graph, boundary, morph dict, segment) are shared by all
+    tests; ``happy_path`` installs them per test.
+    """
+    return _patch_happy_path()
 
-    def __enter__(self):
-        for key, p in self._patches.items():
-            self._mocks[key] = p.start()
-        return self._mocks
 
-    def __exit__(self, *args):
-        for p in self._patches.values():
-            p.stop()
+@pytest.fixture(autouse=True)
+def happy_path(happy_patches, request, monkeypatch):
+    """
+    Install all happy-path replacements for the test.
 
+    Tests marked with ``no_happy_path`` install their own patches.
+    ``monkeypatch`` restores the originals at teardown.
+    """
+    if request.node.get_closest_marker("no_happy_path"):
+        return {}
+    apply_patches(monkeypatch, _hg_mod, happy_patches)
+    return happy_patches
 
-# ---------------------------------------------------------------------------
-# TestGenerateHydrographEndpoint
-# ---------------------------------------------------------------------------
 
+@pytest.fixture
+def no_catchment(override_db, no_stream_db, monkeypatch):
+    """Graph with no sub-catchment at the clicked point (404 path)."""
+    override_db(no_stream_db)
+    monkeypatch.setattr(_hg_mod, "get_catchment_graph", returning(NoCatchmentCG()))
+
+
+@pytest.fixture
+def too_large_catchment(override_db, no_stream_db, monkeypatch):
+    """Graph whose upstream catchment reports 300 km2 (400 path)."""
+    override_db(no_stream_db)
+    mock_cg = FakeCG(
+        stats={
+            "area_km2": 300.0,
+            "elevation_min_m": 100.0,
+            "elevation_max_m": 250.0,
+            "elevation_mean_m": 175.0,
+            "mean_slope_m_per_m": 0.03,
+            "stream_length_km": 20.0,
+        }
+    )
+    apply_patches(
+        monkeypatch,
+        _hg_mod,
+        {
+            "get_catchment_graph": returning(mock_cg),
+            "get_stream_info_by_segment_idx": returning(_SEGMENT),
+        },
+    )
 
-class TestGenerateHydrographEndpoint:
-    """Tests for POST /api/generate-hydrograph."""
 
-    # Default request payload used across most tests
-    _DEFAULT_PAYLOAD = {
+# Default request payload used across most tests (read-only)
+_DEFAULT_PAYLOAD = MappingProxyType(
+    {
         "latitude": 52.23,
         "longitude": 21.01,
         "duration": "1h",
         "probability": 10,
     }
+)
+# Serialized once so default requests skip serialization on every call
+_DEFAULT_PAYLOAD_BYTES = orjson.dumps(dict(_DEFAULT_PAYLOAD))
+_JSON_HEADERS = {"content-type": "application/json"}
 
-    def _post(self, client, payload=None):
-        return client.post(
-            "/api/generate-hydrograph",
-            json=payload or self._DEFAULT_PAYLOAD,
+
+def _json(response) -> dict:
+    """Decode a response body with orjson (faster than ``response.json()``)."""
+    return orjson.loads(response.content)
+
+
+def _body(payload=None) -> dict:
+    """Request body kwargs; the default payload is sent pre-serialized."""
+    if payload is None:
+        return {"content": _DEFAULT_PAYLOAD_BYTES, "headers": _JSON_HEADERS}
+    return {"json": payload}
+
+
+_VALID_DURATIONS = ("15min", "30min", "1h", "2h", "6h", "12h", "24h")
+_VALID_PROBABILITIES = (1, 2, 5, 10, 20, 50)
+_TC_METHODS = ("kirpich", "scs_lag", "giandotti")
+_HIETOGRAM_TYPES = ("beta", "block", "euler_ii")
+
+
+# (field, value) of every variant request, one per parametrized test case
+_VARIANTS = tuple(
+    (field, value)
+    for field, values in (
+        ("duration", _VALID_DURATIONS),
+        ("probability", _VALID_PROBABILITIES),
+        ("tc_method", _TC_METHODS),
+        ("hietogram_type", _HIETOGRAM_TYPES),
+    )
+    for value in values
+)
+
+
+async def _post_concurrently(bodies: tuple[bytes, ...]) -> list[httpx.Response]:
+    """
+    POST all JSON bodies at once through an in-process ASGI client.
+
+    The (sync) endpoint runs in the threadpool, so requests overlap
+    within one event loop instead of running one after another.
+    """
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+        return await asyncio.gather(
+            *(
+                ac.post("/api/generate-hydrograph", content=b, headers=_JSON_HEADERS)
+                for b in bodies
+            )
         )
 
+
+@pytest.fixture(scope="module")
+def variant_responses(happy_patches, override_db_context) -> dict:
+    """
+    POST every variant payload concurrently, once per module.
+
+    Maps ``(field, value)`` to its response, so the variant tests stay
+    parametrized per value while the requests still overlap.
+    """
+    bodies = tuple(
+        orjson.dumps({**_DEFAULT_PAYLOAD, field: value}) for field, value in _VARIANTS
+    )
+    with override_db_context(_PRECIP_DB), pytest.MonkeyPatch.context() as mp:
+        apply_patches(mp, _hg_mod, happy_patches)
+        responses = asyncio.run(_post_concurrently(bodies))
+    return dict(zip(_VARIANTS, responses, strict=True))
+
+
+@pytest.fixture(scope="module")
+def happy_response(client, happy_patches, override_db_context):
+    """
+    POST the default payload once on the happy path and cache the JSON.
+
+    Shared by the response structure tests, which only read it.
+    Module scope sets this up before the per-test ``happy_path``.
+    """
+    with override_db_context(_PRECIP_DB), pytest.MonkeyPatch.context() as mp:
+        apply_patches(mp, _hg_mod, happy_patches)
+        response = client.post("/api/generate-hydrograph", **_body())
+    assert response.status_code == 200
+    return _json(response)
+
+
+# ---------------------------------------------------------------------------
+# TestGenerateHydrographEndpoint
+# ---------------------------------------------------------------------------
+
+
+# Response contract, spelled out independently of the response_model
+_RESPONSE_KEYS = {
+    "watershed",
+    "precipitation",
+    "hydrograph",
+    "water_balance",
+    "metadata",
+}
+_SECTION_KEYS = {
+    "watershed": {
+        "boundary_geojson",
+        "outlet",
+        "area_km2",
+        "hydrograph_available",
+        "morphometry",
+        "hypsometric_curve",
+        "land_cover_stats",
+        "hsg_stats",
+        "main_stream_geojson",
+    },
+    "precipitation": {
+        "total_mm",
+        "duration_min",
+        "probability_percent",
+        "timestep_min",
+        "times_min",
+        "intensities_mm",
+    },
+    "hydrograph": {
+        "times_min",
+        "discharge_m3s",
+        "peak_discharge_m3s",
+        "time_to_peak_min",
+        "total_volume_m3",
+    },
+    "water_balance": {
+        "total_precip_mm",
+        "total_effective_mm",
+        "runoff_coefficient",
+        "cn_used",
+        "retention_mm",
+        "initial_abstraction_mm",
+    },
+    "metadata": {"tc_min", "tc_method", "hietogram_type", "uh_model"},
+}
+_OUTLET_KEYS = {"latitude", "longitude", "elevation_m"}
+
+
+class TestGenerateHydrographEndpoint:
+    """Tests for POST /api/generate-hydrograph."""
+
+    def _post(self, client, payload=None):
+        return client.post("/api/generate-hydrograph", **_body(payload))
+
+    def _post_status(self, client, payload=None) -> int:
+        """POST and return only the status code, without reading the body."""
+        with client.stream(
+            "POST", "/api/generate-hydrograph", **_body(payload)
+        ) as response:
+            return response.status_code
+
     # ---- 1. test_success_returns_200 ----
 
     def test_success_returns_200(self, client):
         """Test successful hydrograph generation returns 200."""
-        mock_db = _make_precip_db_mock()
-        app.dependency_overrides[get_db] = lambda: mock_db
-
-        try:
-            with _HappyPathContext():
-                response = self._post(client)
-            assert response.status_code == 200
-        finally:
-            app.dependency_overrides.clear()
+        status = self._post_status(client)
+        assert status == 200
 
     # ---- 2. test_response_structure ----
 
-    def test_response_structure(self, client):
-        """Test response has correct top-level keys."""
-        mock_db = _make_precip_db_mock()
-        app.dependency_overrides[get_db] = lambda: mock_db
+    def test_response_structure(self, happy_response):
+        """Test response has the expected keys and value types at every level."""
+        data = happy_response
 
-        try:
-            with _HappyPathContext():
-                response = self._post(client)
+        assert data.keys() == _RESPONSE_KEYS
+        for section, keys in _SECTION_KEYS.items():
+            assert data[section].keys() == keys, section
+        assert data["watershed"]["outlet"].keys() == _OUTLET_KEYS
 
-            data = response.json()
-            assert "watershed" in data
-            assert "precipitation" in data
-            assert "hydrograph" in data
-            assert "water_balance" in data
-            assert "metadata" in data
-        finally:
-            app.dependency_overrides.clear()
+        assert isinstance(data["watershed"]["area_km2"], float)
+        assert isinstance(data["watershed"]["hydrograph_available"], bool)
+        assert isinstance(data["hydrograph"]["times_min"], list)
+        assert isinstance(data["hydrograph"]["discharge_m3s"], list)
+        assert isinstance(data["hydrograph"]["peak_discharge_m3s"], float)
+        assert isinstance(data["precipitation"]["probability_percent"], int)
+        assert isinstance(data["water_balance"]["cn_used"], int)
+        assert isinstance(data["metadata"]["tc_method"], str)
 
     # ---- 3. test_hydrograph_data_structure ----
 
-    def test_hydrograph_data_structure(self, client):
+    def test_hydrograph_data_structure(self, happy_response):
         """Test hydrograph data has correct structure."""
-        mock_db = _make_precip_db_mock()
-        app.dependency_overrides[get_db] = lambda: mock_db
-
-        try:
-            with _HappyPathContext():
-                response = self._post(client)
-
-            data = response.json()
-            hydro = data["hydrograph"]
-
-            assert "times_min" in hydro
-            assert "discharge_m3s" in hydro
-            assert "peak_discharge_m3s" in hydro
-            assert "time_to_peak_min" in hydro
-            assert "total_volume_m3" in hydro
-
-            assert len(hydro["times_min"]) > 0
-            assert len(hydro["discharge_m3s"]) > 0
-            assert hydro["peak_discharge_m3s"] > 0
-            assert hydro["time_to_peak_min"] > 0
-            assert hydro["total_volume_m3"] > 0
-        finally:
-            app.dependency_overrides.clear()
+        data = happy_response
+        hydro = data["hydrograph"]
+
+        assert len(hydro["times_min"]) > 0
+        assert len(hydro["discharge_m3s"]) > 0
+        assert hydro["peak_discharge_m3s"] > 0
+        assert hydro["time_to_peak_min"] > 0
+        assert hydro["total_volume_m3"] > 0
 
     # ---- 4. test_water_balance_structure ----
 
-    def test_water_balance_structure(self, client):
+    def test_water_balance_structure(self, happy_response):
         """Test water balance data has correct structure (CN=75 default)."""
-        mock_db = _make_precip_db_mock()
-        app.dependency_overrides[get_db] = lambda: mock_db
-
-        try:
-            with _HappyPathContext():
-                response = self._post(client)
-
-            data = response.json()
-            wb = data["water_balance"]
+        data = happy_response
+        wb = data["water_balance"]
 
-            assert "total_precip_mm" in wb
-            assert "total_effective_mm" in wb
-            assert "runoff_coefficient" in wb
-            assert "cn_used" in wb
-            assert "retention_mm" in wb
-            assert "initial_abstraction_mm" in wb
-
-            assert wb["cn_used"] == 75  # DEFAULT_CN
-            assert 0 <= wb["runoff_coefficient"] <= 1
-        finally:
-            app.dependency_overrides.clear()
+        assert wb["cn_used"] == 75  # DEFAULT_CN
+        assert 0 <= wb["runoff_coefficient"] <= 1
 
     # ---- 5. test_metadata_structure ----
 
-    def test_metadata_structure(self, client):
+    def test_metadata_structure(self, happy_response):
         """Test metadata has correct structure and defaults."""
-        mock_db = _make_precip_db_mock()
-        app.dependency_overrides[get_db] = lambda: mock_db
-
-        try:
-            with _HappyPathContext():
-                response = self._post(client)
+        data = happy_response
+        meta = data["metadata"]
 
-            data = response.json()
-            meta = data["metadata"]
-
-            assert "tc_min" in meta
-            assert "tc_method" in meta
-            assert "hietogram_type" in meta
-            assert "uh_model" in meta
-
-            assert meta["tc_min"] > 0
-            assert meta["tc_method"] == "kirpich"
-            assert meta["hietogram_type"] == "beta"
-            assert meta["uh_model"] == "scs"
-        finally:
-            app.dependency_overrides.clear()
+        assert meta["tc_min"] > 0
+        assert meta["tc_method"] == "kirpich"
+        assert meta["hietogram_type"] == "beta"
+        assert meta["uh_model"] == "scs"
 
     # ---- 6. test_morphometry_in_response ----
 
-    def test_morphometry_in_response(self, client):
+    def test_morphometry_in_response(self, happy_response):
         """Test that morphometry is included in watershed response."""
-        mock_db = _make_precip_db_mock()
-        app.dependency_overrides[get_db] = lambda: mock_db
-
-        try:
-            with _HappyPathContext():
-                response = self._post(client)
-
-            data = response.json()
-            morph = data["watershed"]["morphometry"]
-
-            assert morph is not None
-            assert morph["area_km2"] > 0
-            assert morph["perimeter_km"] > 0
-            assert morph["length_km"] > 0
-            assert morph["elevation_min_m"] < morph["elevation_max_m"]
-            assert morph["source"] == "Hydrograf"
-            assert morph["crs"] == "EPSG:2180"
-        finally:
-            app.dependency_overrides.clear()
+        data = happy_response
+        morph = data["watershed"]["morphometry"]
+
+        assert morph is not None
+        assert morph["area_km2"] > 0
+        assert morph["perimeter_km"] > 0
+        assert morph["length_km"] > 0
+        assert morph["elevation_min_m"] < morph["elevation_max_m"]
+        assert morph["source"] == "Hydrograf"
+        assert morph["crs"] == "EPSG:2180"
 
     # ---- 7. test_no_stream_returns_404 ----
 
-    def test_no_stream_returns_404(self, client):
-        """Test that missing catchment returns 404."""
-        mock_db = MagicMock()
-        app.dependency_overrides[get_db] = lambda: mock_db
+    _NO_STREAM_PAYLOAD = {
+        "latitude": 52.0,
+        "longitude": 21.0,
+        "duration": "1h",
+        "probability": 10,
+    }
 
-        mock_cg = MagicMock()
-        mock_cg.loaded = True
-        mock_cg.find_catchment_at_point.side_effect = ValueError(
-            "Nie znaleziono zlewni cząstkowej"
-        )
+    @pytest.mark.no_happy_path
+    def test_no_stream_returns_404(self, client, no_catchment):
+        """Test that missing catchment returns 404."""
+        status = self._post_status(client, self._NO_STREAM_PAYLOAD)
+        assert status == 404
 
-        try:
-            with patch(f"{_HG}.get_catchment_graph", return_value=mock_cg):
-                response = self._post(
-                    client,
-                    {
-                        "latitude": 52.0,
-                        "longitude": 21.0,
-                        "duration": "1h",
-                        "probability": 10,
-                    },
-                )
-
-            assert response.status_code == 404
-            assert "zlewni" in response.json()["detail"].lower()
-        finally:
-            app.dependency_overrides.clear()
+    @pytest.mark.no_happy_path
+    def test_no_stream_error_message(self, client, no_catchment):
+        """Test the 404 detail tells the user no catchment was found."""
+        response = self._post(client, self._NO_STREAM_PAYLOAD)
+        assert "zlewni" in _json(response)["detail"].lower()
 
     # ---- 8. test_area_too_large_returns_400 ----
 
-    def test_area_too_large_returns_400(self, client):
+    @pytest.mark.no_happy_path
+    def test_area_too_large_returns_400(self, client, too_large_catchment):
         """Test that watershed > 250 km2 returns 400."""
-        mock_db = MagicMock()
-        app.dependency_overrides[get_db] = lambda: mock_db
-
-        # CatchmentGraph that reports 300 km2
-        mock_cg = _make_mock_cg()
-        mock_cg.aggregate_stats.return_value = {
-            "area_km2": 300.0,
-            "elevation_min_m": 100.0,
-            "elevation_max_m": 250.0,
-            "elevation_mean_m": 175.0,
-            "mean_slope_m_per_m": 0.03,
-            "stream_length_km": 20.0,
-        }
-        segment = _make_segment_dict()
-
-        try:
-            with (
-                patch(f"{_HG}.get_catchment_graph", return_value=mock_cg),
-                patch(f"{_HG}.get_stream_info_by_segment_idx", return_value=segment),
-            ):
-                response = self._post(client)
+        status = self._post_status(client)
+        assert status == 400
 
-            assert response.status_code == 400
-            assert "250" in response.json()["detail"]
-        finally:
-            app.dependency_overrides.clear()
+    @pytest.mark.no_happy_path
+    def test_area_too_large_error_message(self, client, too_large_catchment):
+        """Test the 400 detail mentions the 250 km2 limit."""
+        response = self._post(client)
+        assert "250" in _json(response)["detail"]
 
     # ---- 9. test_invalid_duration_returns_422 ----
 
+    @pytest.mark.no_happy_path
     def test_invalid_duration_returns_422(self, client):
         """Test that invalid duration returns 422 (Pydantic validation)."""
-        response = self._post(
+        status = self._post_status(
             client,
             {
                 "latitude": 52.23,
@@ -426,187 +518,126 @@ class TestGenerateHydrographEndpoint:
             },
         )
 
-        assert response.status_code == 422
+        assert status == 422
 
     # ---- 10. test_invalid_probability_returns_400 ----
 
     def test_invalid_probability_returns_400(self, client):
         """Test that invalid probability returns 400."""
-        mock_db = _make_precip_db_mock()
-        app.dependency_overrides[get_db] = lambda: mock_db
-
-        try:
-            with _HappyPathContext():
-                response = self._post(
-                    client,
-                    {
-                        "latitude": 52.23,
-                        "longitude": 21.01,
-                        "duration": "1h",
-                        "probability": 15,  # Invalid (not in 1,2,5,10,20,50)
-                    },
-                )
-
-            assert response.status_code == 400
-        finally:
-            app.dependency_overrides.clear()
+        status = self._post_status(
+            client,
+            {
+                "latitude": 52.23,
+                "longitude": 21.01,
+                "duration": "1h",
+                "probability": 15,  # Invalid (not in 1,2,5,10,20,50)
+            },
+        )
+
+        assert status == 400
 
     # ---- 11. test_valid_durations ----
 
-    def test_valid_durations(self, client):
+    @pytest.mark.parametrize("duration", _VALID_DURATIONS)
+    def test_valid_durations(self, variant_responses, duration):
         """Test all valid duration values produce 200."""
-        mock_db = _make_precip_db_mock()
-        app.dependency_overrides[get_db] = lambda: mock_db
-
-        valid_durations = ["15min", "30min", "1h", "2h", "6h", "12h", "24h"]
-
-        try:
-            with _HappyPathContext():
-                for duration in valid_durations:
-                    response = self._post(
-                        client,
-                        {
-                            "latitude": 52.23,
-                            "longitude": 21.01,
-                            "duration": duration,
-                            "probability": 10,
-                        },
-                    )
-                    assert response.status_code == 200, (
-                        f"Failed for duration={duration}"
-                    )
-        finally:
-            app.dependency_overrides.clear()
+        assert variant_responses["duration", duration].status_code == 200
 
     # ---- 12. test_valid_probabilities ----
 
-    def test_valid_probabilities(self, client):
+    @pytest.mark.parametrize("prob", _VALID_PROBABILITIES)
+    def test_valid_probabilities(self, variant_responses, prob):
         """Test all valid probability values produce 200."""
-        mock_db = _make_precip_db_mock()
-        app.dependency_overrides[get_db] = lambda: mock_db
-
-        valid_probabilities = [1, 2, 5, 10, 20, 50]
-
-        try:
-            with _HappyPathContext():
-                for prob in valid_probabilities:
-                    response = self._post(
-                        client,
-                        {
-                            "latitude": 52.23,
-                            "longitude": 21.01,
-                            "duration": "1h",
-                            "probability": prob,
-                        },
-                    )
-                    assert response.status_code == 200, f"Failed for probability={prob}"
-        finally:
-            app.dependency_overrides.clear()
+        assert variant_responses["probability", prob].status_code == 200
 
     # ---- 13. test_different_tc_methods ----
 
-    def test_different_tc_methods(self, client):
+    @pytest.mark.parametrize("method", _TC_METHODS)
+    def test_different_tc_methods(self, variant_responses, method):
         """Test different time of concentration methods."""
-        mock_db = _make_precip_db_mock()
-        app.dependency_overrides[get_db] = lambda: mock_db
-
-        methods = ["kirpich", "scs_lag", "giandotti"]
-
-        try:
-            with _HappyPathContext():
-                for method in methods:
-                    response = self._post(
-                        client,
-                        {
-                            "latitude": 52.23,
-                            "longitude": 21.01,
-                            "duration": "1h",
-                            "probability": 10,
-                            "tc_method": method,
-                        },
-                    )
-                    assert response.status_code == 200, f"Failed for tc_method={method}"
-                    assert response.json()["metadata"]["tc_method"] == method
-        finally:
-            app.dependency_overrides.clear()
+        response = variant_responses["tc_method", method]
+        assert response.status_code == 200
+        assert _json(response)["metadata"]["tc_method"] == method
 
     # ---- 14. test_different_hietogram_types ----
 
-    def test_different_hietogram_types(self, client):
+    @pytest.mark.parametrize("htype", _HIETOGRAM_TYPES)
+    def test_different_hietogram_types(self, variant_responses, htype):
         """Test different hietogram types."""
-        mock_db = _make_precip_db_mock()
-        app.dependency_overrides[get_db] = lambda: mock_db
-
-        types = ["beta", "block", "euler_ii"]
-
-        try:
-            with _HappyPathContext():
-                for htype in types:
-                    response = self._post(
-                        client,
-                        {
-                            "latitude": 52.23,
-                            "longitude": 21.01,
-                            "duration": "1h",
-                            "probability": 10,
-                            "hietogram_type": htype,
-                        },
-                    )
-                    assert response.status_code == 200, (
-                        f"Failed for hietogram_type={htype}"
-                    )
-                    assert response.json()["metadata"]["hietogram_type"] == htype
-        finally:
-            app.dependency_overrides.clear()
+        response = variant_responses["hietogram_type", htype]
+        assert response.status_code == 200
+        assert _json(response)["metadata"]["hietogram_type"] == htype
 
     # ---- 15. test_custom_timestep ----
 
     def test_custom_timestep(self, client):
         """Test custom timestep parameter."""
-        mock_db = _make_precip_db_mock()
-        app.dependency_overrides[get_db] = lambda: mock_db
-
-        try:
-            with _HappyPathContext():
-                response = self._post(
-                    client,
-                    {
-                        "latitude": 52.23,
-                        "longitude": 21.01,
-                        "duration": "1h",
-                        "probability": 10,
-                        "timestep_min": 10.0,
-                    },
-                )
-
-            assert response.status_code == 200
-            data = response.json()
-            assert data["precipitation"]["timestep_min"] == 10.0
-        finally:
-            app.dependency_overrides.clear()
+        response = self._post(
+            client,
+            {
+                "latitude": 52.23,
+                "longitude": 21.01,
+                "duration": "1h",
+                "probability": 10,
+                "timestep_min": 10.0,
+            },
+        )
+
+        assert response.status_code == 200
+        data = _json(response)
+        assert data["precipitation"]["timestep_min"] == 10.0
 
     # ---- 16. test_precipitation_info_structure ----
 
-    def test_precipitation_info_structure(self, client):
+    def test_precipitation_info_structure(self, happy_response):
         """Test precipitation info has correct structure and values."""
-        mock_db = _make_precip_db_mock()
-        app.dependency_overrides[get_db] = lambda: mock_db
+        data = happy_response
+        precip = data["precipitation"]
+
+        assert precip["total_mm"] == 45.0  # Mocked value
+        assert precip["duration_min"] == 60.0
+        assert precip["probability_percent"] == 10
+        assert precip["timestep_min"] == 5.0
+        assert len(precip["times_min"]) > 0
+        assert len(precip["intensities_mm"]) > 0
+
 
-        try:
-            with _HappyPathContext():
-                response = self._post(client)
+# ---------------------------------------------------------------------------
+# TestHydrographRequestValidation (model-level, no HTTP round trip)
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.no_happy_path
+class TestHydrographRequestValidation:
+    """
+    Validation rules of HydrographRequest, checked on the model directly.
+
+    test_invalid_duration_returns_422 keeps the HTTP-level wiring covered.
+    """
+
+    @pytest.mark.parametrize(
+        "field, value",
+        [
+            ("duration", "45min"),
+            ("latitude", 91.0),
+            ("longitude", -181.0),
+            ("timestep_min", 0.5),
+            ("tc_method", "rational"),
+            ("hietogram_type", "triangle"),
+        ],
+    )
+    def test_invalid_field_raises(self, field, value):
+        """Test that an out-of-range or unknown value is rejected."""
+        with pytest.raises(ValidationError):
+            HydrographRequest.model_validate({**_DEFAULT_PAYLOAD, field: value})
 
-            data = response.json()
-            precip = data["precipitation"]
+    def test_defaults(self):
+        """Test optional fields fall back to their defaults."""
+        request = HydrographRequest.model_validate(_DEFAULT_PAYLOAD)
 
-            assert precip["total_mm"] == 45.0  # Mocked value
-            assert precip["duration_min"] == 60.0
-            assert precip["probability_percent"] == 10
-            assert precip["timestep_min"] == 5.0
-            assert len(precip["times_min"]) > 0
-            assert len(precip["intensities_mm"]) > 0
-        finally:
-            app.dependency_overrides.clear()
+        assert request.timestep_min == 5.0
+        assert request.tc_method == "kirpich"
+        assert request.hietogram_type == "beta"
 
 
 # ---------------------------------------------------------------------------
@@ -614,18 +645,29 @@ class TestGenerateHydrographEndpoint:
 # ---------------------------------------------------------------------------
 
 
+@pytest.fixture(scope="session")
+def scenarios_response(client):
+    """GET /api/scenarios once; the payload is static."""
+    return client.get("/api/scenarios")
+
+
+@pytest.fixture(scope="session")
+def scenarios_payload(scenarios_response):
+    """Decoded /api/scenarios payload shared by the scenarios tests."""
+    return _json(scenarios_response)
+
+
+@pytest.mark.no_happy_path
 class TestScenariosEndpoint:
     """Tests for GET /api/scenarios endpoint."""
 
-    def test_scenarios_returns_200(self, client):
+    def test_scenarios_returns_200(self, scenarios_response):
         """Test scenarios endpoint returns 200."""
-        response = client.get("/api/scenarios")
-        assert response.status_code == 200
+        assert scenarios_response.status_code == 200
 
-    def test_scenarios_response_structure(self, client):
+    def test_scenarios_response_structure(self, scenarios_payload):
         """Test scenarios response has correct structure."""
-        response = client.get("/api/scenarios")
-        data = response.json()
+        data = scenarios_payload
 
         assert "durations" in data
         assert "probabilities" in data
@@ -633,25 +675,16 @@ class TestScenariosEndpoint:
         assert "hietogram_types" in data
         assert "area_limit_km2" in data
 
-    def test_scenarios_valid_durations(self, client):
+    def test_scenarios_valid_durations(self, scenarios_payload):
         """Test scenarios returns valid durations."""
-        response = client.get("/api/scenarios")
-        data = response.json()
-
         expected = ["12h", "15min", "1h", "24h", "2h", "30min", "6h"]
-        assert data["durations"] == expected
+        assert scenarios_payload["durations"] == expected
 
-    def test_scenarios_valid_probabilities(self, client):
+    def test_scenarios_valid_probabilities(self, scenarios_payload):
         """Test scenarios returns valid probabilities."""
-        response = client.get("/api/scenarios")
-        data = response.json()
-
         expected = [1, 2, 5, 10, 20, 50]
-        assert data["probabilities"] == expected
+        assert scenarios_payload["probabilities"] == expected
 
-    def test_scenarios_area_limit(self, client):
+    def test_scenarios_area_limit(self, scenarios_payload):
         """Test scenarios returns area limit."""
-        response = client.get("/api/scenarios")
-        data = response.json()
-
-        assert data["area_limit_km2"] == 250.0
+        assert scenarios_payload["area_limit_km2"] == 250.0
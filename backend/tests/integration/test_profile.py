@@ -3,19 +3,44 @@ Integration tests for terrain profile endpoint.
 """
 
 from contextlib import contextmanager
-from unittest.mock import MagicMock, patch
 
 import numpy as np
+import orjson
 import pytest
-from fastapi.testclient import TestClient
-
-from api.main import app
-
-
-@pytest.fixture
-def client():
-    """Create test client."""
-    return TestClient(app)
+from pydantic import ValidationError
+
+from models.schemas import TerrainProfileRequest
+
+_TWO_POINT_LINE = {
+    "type": "LineString",
+    "coordinates": [[21.0, 52.0], [21.01, 52.01]],
+}
+# Request bodies serialized once so repeated requests skip json.dumps
+_BODY_TWO_POINT = orjson.dumps({"geometry": _TWO_POINT_LINE, "n_samples": 5})
+_BODY_MULTI = orjson.dumps(
+    {
+        "geometry": {
+            "type": "LineString",
+            "coordinates": [
+                [21.0, 52.0],
+                [21.005, 52.005],
+                [21.01, 52.01],
+                [21.015, 52.005],
+            ],
+        },
+        "n_samples": 5,
+    }
+)
+_JSON_HEADERS = {"content-type": "application/json"}
+
+
+def _post(client, payload: dict | bytes = _BODY_TWO_POINT):
+    """POST to the terrain-profile endpoint; bytes are sent as-is."""
+    if isinstance(payload, bytes):
+        return client.post(
+            "/api/terrain-profile", content=payload, headers=_JSON_HEADERS
+        )
+    return client.post("/api/terrain-profile", json=payload)
 
 
 def _make_rasterio_ctx(mock_dataset):
@@ -28,163 +53,132 @@ def _make_rasterio_ctx(mock_dataset):
     return _open
 
 
-@pytest.fixture
-def mock_rasterio_dataset():
-    """Create a mock rasterio dataset that returns elevation data."""
-    mock_dataset = MagicMock()
-    mock_dataset.nodata = -9999.0
+class _FakeDataset:
+    """Plain stand-in for an open rasterio dataset (``nodata`` + ``sample``)."""
+
+    __slots__ = ("nodata", "sample")
+
+    def __init__(self, sample, nodata: float = -9999.0):
+        self.nodata = nodata
+        self.sample = sample
+
 
-    # Return realistic elevation values for each sample point
-    def sample_generator(points):
-        for i, _ in enumerate(points):
-            yield np.array([150.0 + i * 5.0])
+def _ramp(step: float):
+    """Build a sampler returning 150 m rising by ``step`` per sample point."""
 
-    mock_dataset.sample = sample_generator
-    return mock_dataset
+    def sample(points):
+        # (N, 2) array of x, y in -> (N, 1) array of band values out
+        n = len(points)
+        return (150.0 + step * np.arange(n)).astype(np.float32).reshape(n, 1)
+
+    return sample
+
+
+def _all_nodata(points):
+    """Sampler returning the nodata value for every point."""
+    return np.full((len(points), 1), -9999.0, dtype=np.float32)
+
+
+@pytest.fixture(scope="module")
+def mock_rasterio_dataset():
+    """Create a mock rasterio dataset that returns elevation data."""
+    return _FakeDataset(_ramp(5.3))
 
 
 @pytest.fixture
 def mock_rasterio_nodata():
     """Create a mock rasterio dataset that returns all nodata."""
-    mock_dataset = MagicMock()
-    mock_dataset.nodata = -9999.0
+    return _FakeDataset(_all_nodata)
+
+
+def _patch_dem(mp, dataset):
+    """Point the endpoint at an existing DEM backed by ``dataset``."""
+    mp.setattr("api.endpoints.profile.os.path.exists", lambda _path: True)
+    mp.setattr("api.endpoints.profile.rasterio.open", _make_rasterio_ctx(dataset))
+
 
-    def sample_generator(points):
-        for _ in points:
-            yield np.array([-9999.0])
+@pytest.fixture(autouse=True)
+def patch_profile(monkeypatch, mock_rasterio_dataset):
+    """Serve every test from the mock DEM unless it opts into an override."""
+    _patch_dem(monkeypatch, mock_rasterio_dataset)
 
-    mock_dataset.sample = sample_generator
-    return mock_dataset
+
+@pytest.fixture
+def nodata_dem(monkeypatch, mock_rasterio_nodata):
+    """Override patch_profile with a DEM that returns only nodata."""
+    monkeypatch.setattr(
+        "api.endpoints.profile.rasterio.open",
+        _make_rasterio_ctx(mock_rasterio_nodata),
+    )
+
+
+@pytest.fixture
+def missing_dem(monkeypatch):
+    """Override patch_profile with a DEM file that does not exist."""
+    monkeypatch.setattr("api.endpoints.profile.os.path.exists", lambda _path: False)
+
+
+@pytest.fixture(scope="module")
+def happy_response(client, mock_rasterio_dataset):
+    """
+    POST the two-point line once on the happy path and cache the response.
+
+    Shared by the response structure tests, which only read it.
+    """
+    with pytest.MonkeyPatch.context() as mp:
+        _patch_dem(mp, mock_rasterio_dataset)
+        return _post(client)
+
+
+@pytest.fixture(scope="module")
+def happy_data(happy_response):
+    """JSON body of ``happy_response``, decoded once with orjson."""
+    return orjson.loads(happy_response.content)
+
+
+@pytest.fixture(scope="module")
+def happy_headers(happy_response):
+    """Headers of ``happy_response`` as a plain dict with lower-cased names."""
+    return {k.lower(): v for k, v in happy_response.headers.items()}
 
 
 class TestTerrainProfileEndpoint:
     """Tests for POST /api/terrain-profile."""
 
-    def test_success_returns_200(self, client, mock_rasterio_dataset):
+    def test_success_returns_200(self, happy_response):
         """Test successful profile extraction returns 200."""
-        with (
-            patch("api.endpoints.profile.os.path.exists", return_value=True),
-            patch(
-                "api.endpoints.profile.rasterio.open",
-                new=_make_rasterio_ctx(mock_rasterio_dataset),
-            ),
-        ):
-            response = client.post(
-                "/api/terrain-profile",
-                json={
-                    "geometry": {
-                        "type": "LineString",
-                        "coordinates": [[21.0, 52.0], [21.01, 52.01]],
-                    },
-                    "n_samples": 5,
-                },
-            )
+        assert happy_response.status_code == 200
 
-        assert response.status_code == 200
-
-    def test_response_structure(self, client, mock_rasterio_dataset):
+    def test_response_structure(self, happy_data):
         """Test response has correct structure."""
-        with (
-            patch("api.endpoints.profile.os.path.exists", return_value=True),
-            patch(
-                "api.endpoints.profile.rasterio.open",
-                new=_make_rasterio_ctx(mock_rasterio_dataset),
-            ),
-        ):
-            response = client.post(
-                "/api/terrain-profile",
-                json={
-                    "geometry": {
-                        "type": "LineString",
-                        "coordinates": [[21.0, 52.0], [21.01, 52.01]],
-                    },
-                    "n_samples": 5,
-                },
-            )
+        assert "distances_m" in happy_data
+        assert "elevations_m" in happy_data
+        assert "total_length_m" in happy_data
 
-        data = response.json()
-        assert "distances_m" in data
-        assert "elevations_m" in data
-        assert "total_length_m" in data
-
-    def test_distances_and_elevations_lengths_match(
-        self, client, mock_rasterio_dataset
-    ):
+    def test_distances_and_elevations_lengths_match(self, happy_data):
         """Test that distances and elevations arrays have same length."""
-        with (
-            patch("api.endpoints.profile.os.path.exists", return_value=True),
-            patch(
-                "api.endpoints.profile.rasterio.open",
-                new=_make_rasterio_ctx(mock_rasterio_dataset),
-            ),
-        ):
-            response = client.post(
-                "/api/terrain-profile",
-                json={
-                    "geometry": {
-                        "type": "LineString",
-                        "coordinates": [[21.0, 52.0], [21.01, 52.01]],
-                    },
-                    "n_samples": 5,
-                },
-            )
-
-        data = response.json()
-        assert len(data["distances_m"]) == len(data["elevations_m"])
-        assert len(data["distances_m"]) == 5
+        assert len(happy_data["distances_m"]) == len(happy_data["elevations_m"])
+        assert len(happy_data["distances_m"]) == 5
 
-    def test_total_length_positive(self, client, mock_rasterio_dataset):
+    def test_total_length_positive(self, happy_data):
         """Test that total_length_m is positive for a real line."""
-        with (
-            patch("api.endpoints.profile.os.path.exists", return_value=True),
-            patch(
-                "api.endpoints.profile.rasterio.open",
-                new=_make_rasterio_ctx(mock_rasterio_dataset),
-            ),
-        ):
-            response = client.post(
-                "/api/terrain-profile",
-                json={
-                    "geometry": {
-                        "type": "LineString",
-                        "coordinates": [[21.0, 52.0], [21.01, 52.01]],
-                    },
-                    "n_samples": 5,
-                },
-            )
-
-        data = response.json()
-        assert data["total_length_m"] > 0
+        assert happy_data["total_length_m"] > 0
 
-    def test_elevations_are_floats(self, client, mock_rasterio_dataset):
+    def test_elevations_are_floats(self, happy_data):
         """Test that elevation values are numeric."""
-        with (
-            patch("api.endpoints.profile.os.path.exists", return_value=True),
-            patch(
-                "api.endpoints.profile.rasterio.open",
-                new=_make_rasterio_ctx(mock_rasterio_dataset),
-            ),
-        ):
-            response = client.post(
-                "/api/terrain-profile",
-                json={
-                    "geometry": {
-                        "type": "LineString",
-                        "coordinates": [[21.0, 52.0], [21.01, 52.01]],
-                    },
-                    "n_samples": 5,
-                },
-            )
-
-        data = response.json()
-        for elev in data["elevations_m"]:
+        for elev in happy_data["elevations_m"]:
             assert isinstance(elev, float)
 
+    def test_elevations_rounded_to_centimetres(self, happy_data):
+        """Elevations are rounded to 0.01 m, the DEM's float32 precision."""
+        for elev in happy_data["elevations_m"]:
+            assert elev == round(elev, 2)
+
     def test_non_linestring_returns_400(self, client):
         """Test that non-LineString geometry returns 400."""
-        response = client.post(
-            "/api/terrain-profile",
-            json={
+        response = _post(
+            client,
+            {
                 "geometry": {
                     "type": "Point",
                     "coordinates": [21.0, 52.0],
@@ -198,9 +192,9 @@ class TestTerrainProfileEndpoint:
 
     def test_too_few_coordinates_returns_400(self, client):
         """Test that LineString with < 2 coordinates returns 400."""
-        response = client.post(
-            "/api/terrain-profile",
-            json={
+        response = _post(
+            client,
+            {
                 "geometry": {
                     "type": "LineString",
                     "coordinates": [[21.0, 52.0]],
@@ -212,228 +206,63 @@ class TestTerrainProfileEndpoint:
         assert response.status_code == 400
         assert "2 coordinates" in response.json()["detail"]
 
-    def test_nodata_result_returns_404(self, client, mock_rasterio_nodata):
+    def test_nodata_result_returns_404(self, client, nodata_dem):
         """Test that all-nodata profile result returns 404."""
-        with (
-            patch("api.endpoints.profile.os.path.exists", return_value=True),
-            patch(
-                "api.endpoints.profile.rasterio.open",
-                new=_make_rasterio_ctx(mock_rasterio_nodata),
-            ),
-        ):
-            response = client.post(
-                "/api/terrain-profile",
-                json={
-                    "geometry": {
-                        "type": "LineString",
-                        "coordinates": [[21.0, 52.0], [21.01, 52.01]],
-                    },
-                    "n_samples": 5,
-                },
-            )
+        response = _post(client)
 
         assert response.status_code == 404
 
-    def test_dem_not_found_returns_503(self, client):
+    def test_dem_not_found_returns_503(self, client, missing_dem):
         """Test that missing DEM file returns 503."""
-        with patch("api.endpoints.profile.os.path.exists", return_value=False):
-            response = client.post(
-                "/api/terrain-profile",
-                json={
-                    "geometry": {
-                        "type": "LineString",
-                        "coordinates": [[21.0, 52.0], [21.01, 52.01]],
-                    },
-                    "n_samples": 5,
-                },
-            )
+        response = _post(client)
 
         assert response.status_code == 503
         assert "DEM" in response.json()["detail"]
 
-    def test_n_samples_too_low_returns_422(self, client):
-        """Test that n_samples < 2 returns 422."""
-        response = client.post(
-            "/api/terrain-profile",
-            json={
-                "geometry": {
-                    "type": "LineString",
-                    "coordinates": [[21.0, 52.0], [21.01, 52.01]],
-                },
-                "n_samples": 1,
-            },
-        )
-
-        assert response.status_code == 422
-
-    def test_n_samples_too_high_returns_422(self, client):
-        """Test that n_samples > 1000 returns 422."""
-        response = client.post(
-            "/api/terrain-profile",
-            json={
-                "geometry": {
-                    "type": "LineString",
-                    "coordinates": [[21.0, 52.0], [21.01, 52.01]],
-                },
-                "n_samples": 1001,
-            },
-        )
-
-        assert response.status_code == 422
-
     def test_missing_geometry_returns_422(self, client):
-        """Test that missing geometry returns 422."""
-        response = client.post(
-            "/api/terrain-profile",
-            json={"n_samples": 5},
-        )
+        """Test that missing geometry returns 422 (HTTP-level smoke test)."""
+        response = _post(client, {"n_samples": 5})
 
         assert response.status_code == 422
 
-    def test_default_n_samples(self, client, mock_rasterio_dataset):
+    def test_default_n_samples(self, client, monkeypatch):
         """Test that default n_samples is used when not specified."""
-        # Mock dataset that works for any number of sample points
-        mock_ds = MagicMock()
-        mock_ds.nodata = -9999.0
-
-        def sample_gen(points):
-            for i, _ in enumerate(points):
-                yield np.array([150.0 + i * 0.5])
-
-        mock_ds.sample = sample_gen
-
-        with (
-            patch("api.endpoints.profile.os.path.exists", return_value=True),
-            patch(
-                "api.endpoints.profile.rasterio.open",
-                new=_make_rasterio_ctx(mock_ds),
-            ),
-        ):
-            response = client.post(
-                "/api/terrain-profile",
-                json={
-                    "geometry": {
-                        "type": "LineString",
-                        "coordinates": [[21.0, 52.0], [21.01, 52.01]],
-                    },
-                },
-            )
+        # Gentler ramp so 100 samples stay within a realistic range
+        monkeypatch.setattr(
+            "api.endpoints.profile.rasterio.open",
+            _make_rasterio_ctx(_FakeDataset(_ramp(0.5))),
+        )
+
+        response = _post(client, {"geometry": _TWO_POINT_LINE})
 
         assert response.status_code == 200
         data = response.json()
         assert len(data["distances_m"]) == 100  # default n_samples
 
-    def test_multi_point_linestring(self, client, mock_rasterio_dataset):
+    def test_multi_point_linestring(self, client):
         """Test profile with multi-point LineString geometry."""
-        with (
-            patch("api.endpoints.profile.os.path.exists", return_value=True),
-            patch(
-                "api.endpoints.profile.rasterio.open",
-                new=_make_rasterio_ctx(mock_rasterio_dataset),
-            ),
-        ):
-            response = client.post(
-                "/api/terrain-profile",
-                json={
-                    "geometry": {
-                        "type": "LineString",
-                        "coordinates": [
-                            [21.0, 52.0],
-                            [21.005, 52.005],
-                            [21.01, 52.01],
-                            [21.015, 52.005],
-                        ],
-                    },
-                    "n_samples": 5,
-                },
-            )
+        response = _post(client, _BODY_MULTI)
 
         assert response.status_code == 200
 
-    def test_cache_control_header(self, client, mock_rasterio_dataset):
+    def test_cache_control_header(self, happy_response, happy_headers):
         """Test that successful response includes Cache-Control header."""
-        with (
-            patch("api.endpoints.profile.os.path.exists", return_value=True),
-            patch(
-                "api.endpoints.profile.rasterio.open",
-                new=_make_rasterio_ctx(mock_rasterio_dataset),
-            ),
-        ):
-            response = client.post(
-                "/api/terrain-profile",
-                json={
-                    "geometry": {
-                        "type": "LineString",
-                        "coordinates": [[21.0, 52.0], [21.01, 52.01]],
-                    },
-                    "n_samples": 5,
-                },
-            )
+        assert happy_response.status_code == 200
+        assert happy_headers.get("cache-control") == "public, max-age=3600"
 
-        assert response.status_code == 200
-        assert response.headers.get("cache-control") == "public, max-age=3600"
-
-    def test_distances_start_at_zero(self, client, mock_rasterio_dataset):
+    def test_distances_start_at_zero(self, happy_data):
         """Test that the first distance value is 0."""
-        with (
-            patch("api.endpoints.profile.os.path.exists", return_value=True),
-            patch(
-                "api.endpoints.profile.rasterio.open",
-                new=_make_rasterio_ctx(mock_rasterio_dataset),
-            ),
-        ):
-            response = client.post(
-                "/api/terrain-profile",
-                json={
-                    "geometry": {
-                        "type": "LineString",
-                        "coordinates": [[21.0, 52.0], [21.01, 52.01]],
-                    },
-                    "n_samples": 5,
-                },
-            )
+        assert happy_data["distances_m"][0] == 0.0
 
-        data = response.json()
-        assert data["distances_m"][0] == 0.0
-
-    def test_distances_monotonically_increasing(self, client, mock_rasterio_dataset):
+    def test_distances_monotonically_increasing(self, happy_data):
         """Test that distances are monotonically increasing."""
-        with (
-            patch("api.endpoints.profile.os.path.exists", return_value=True),
-            patch(
-                "api.endpoints.profile.rasterio.open",
-                new=_make_rasterio_ctx(mock_rasterio_dataset),
-            ),
-        ):
-            response = client.post(
-                "/api/terrain-profile",
-                json={
-                    "geometry": {
-                        "type": "LineString",
-                        "coordinates": [[21.0, 52.0], [21.01, 52.01]],
-                    },
-                    "n_samples": 5,
-                },
-            )
-
-        data = response.json()
-        distances = data["distances_m"]
+        distances = happy_data["distances_m"]
         for i in range(1, len(distances)):
             assert distances[i] > distances[i - 1]
 
-    def test_503_does_not_leak_server_path(self, client):
+    def test_503_does_not_leak_server_path(self, client, missing_dem):
         """503 error must not contain server filesystem paths (CR8)."""
-        with patch("api.endpoints.profile.os.path.exists", return_value=False):
-            response = client.post(
-                "/api/terrain-profile",
-                json={
-                    "geometry": {
-                        "type": "LineString",
-                        "coordinates": [[21.0, 52.0], [21.01, 52.01]],
-                    },
-                    "n_samples": 5,
-                },
-            )
+        response = _post(client)
 
         assert response.status_code == 503
         detail = response.json()["detail"]
@@ -441,14 +270,42 @@ class TestTerrainProfileEndpoint:
         assert ".vrt" not in detail
 
     def test_nodata_uses_approximate_comparison(self, client):
-        """Nodata detection must use approximate float comparison, not == (CR8)."""
+        """Nodata mask must use vectorized np.isclose, not float == (CR8)."""
         import inspect
 
         from api.endpoints.profile import terrain_profile
         source = inspect.getsource(terrain_profile)
-        assert "isclose" in source, (
-            "Must use math.isclose for nodata comparison"
+        assert "np.isclose(" in source, (
+            "Must build the nodata mask with np.isclose over all samples"
         )
-        assert "elev == dataset.nodata" not in source, (
+        assert "== dataset.nodata" not in source, (
             "Must not use == for float nodata"
         )
+
+
+class TestTerrainProfileRequestValidation:
+    """
+    Validation rules of TerrainProfileRequest, checked on the model directly.
+
+    test_missing_geometry_returns_422 keeps the HTTP-level wiring covered.
+    """
+
+    @pytest.mark.parametrize(
+        "payload",
+        [
+            {"geometry": _TWO_POINT_LINE, "n_samples": 1},
+            {"geometry": _TWO_POINT_LINE, "n_samples": 1001},
+            {"n_samples": 5},
+        ],
+        ids=["n_samples_too_low", "n_samples_too_high", "missing_geometry"],
+    )
+    def test_invalid_payload_raises(self, payload):
+        """Test that n_samples outside 2..1000 or missing geometry is rejected."""
+        with pytest.raises(ValidationError):
+            TerrainProfileRequest.model_validate(payload)
+
+    def test_default_n_samples(self):
+        """Test that n_samples defaults to 100."""
+        request = TerrainProfileRequest.model_validate({"geometry": _TWO_POINT_LINE})
+
+        assert request.n_samples == 100
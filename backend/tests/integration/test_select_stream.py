@@ -5,321 +5,299 @@ Tests the graph-based select-stream endpoint that uses CatchmentGraph
 and stream_catchments for watershed delineation.
 """
 
-from unittest.mock import MagicMock, patch
+from types import SimpleNamespace
 
 import numpy as np
 import pytest
-from fastapi.testclient import TestClient
 from scipy import sparse
+from shapely.geometry import MultiPolygon, Polygon
 
-from api.main import app
 from core.catchment_graph import CatchmentGraph
-from core.database import get_db
-
-
-@pytest.fixture
-def client():
-    """Create test client."""
-    return TestClient(app)
+from core.constants import DEFAULT_THRESHOLD_M2
+from tests.fakes import FakeResult, FakeSession
+
+# Arrays of the 3-node test graph, built once and shared by every mock
+# CatchmentGraph (the endpoint only reads them)
+_SEG_IDX = np.array([10, 11, 12], dtype=np.int32)
+_THRESHOLD = np.array([10000, 10000, 10000], dtype=np.int32)
+_AREA = np.array([2.0, 3.0, 5.0], dtype=np.float32)
+_ELEV_MIN = np.array([140.0, 150.0, 120.0], dtype=np.float32)
+_ELEV_MAX = np.array([180.0, 190.0, 160.0], dtype=np.float32)
+_ELEV_MEAN = np.array([160.0, 170.0, 140.0], dtype=np.float32)
+_SLOPE = np.array([4.0, 5.0, 3.0], dtype=np.float32)
+_PERIM = np.array([8.0, 10.0, 15.0], dtype=np.float32)
+_STREAM_LEN = np.array([1.5, 2.0, 3.0], dtype=np.float32)
+_STRAHLER = np.array([1, 1, 2], dtype=np.int8)
+_HISTOGRAMS = [
+    {"base_m": 140, "interval_m": 1, "counts": [10, 20, 30, 20, 10]},
+    {"base_m": 150, "interval_m": 1, "counts": [15, 25, 15]},
+    {"base_m": 120, "interval_m": 1, "counts": [5, 10, 15, 20, 15, 10, 5]},
+]
+_LOOKUP = {
+    (10000, 10): 0,
+    (10000, 11): 1,
+    (10000, 12): 2,
+}
+# Shared by every test, so make accidental in-place writes fail loudly
+for _arr in (
+    _SEG_IDX,
+    _THRESHOLD,
+    _AREA,
+    _ELEV_MIN,
+    _ELEV_MAX,
+    _ELEV_MEAN,
+    _SLOPE,
+    _PERIM,
+    _STREAM_LEN,
+    _STRAHLER,
+):
+    _arr.setflags(write=False)
+# 10→12, 11→12 (12 is outlet): row 2 lists upstream nodes 0 and 1.
+# Built from CSR arrays directly, skipping the COO→CSR conversion.
+_UPSTREAM_CSR = sparse.csr_matrix(
+    (
+        np.ones(2, dtype=np.int8),
+        np.array([0, 1], dtype=np.int32),
+        np.array([0, 0, 0, 2], dtype=np.int32),
+    ),
+    shape=(3, 3),
+    dtype=np.int8,
+)
+
+# ST_Union boundary as WKB (a simple 100 m square), serialized once
+_BOUNDARY_WKB = MultiPolygon(
+    [
+        Polygon(
+            [
+                (639100, 486650),
+                (639200, 486650),
+                (639200, 486750),
+                (639100, 486750),
+                (639100, 486650),
+            ]
+        )
+    ]
+).wkb
 
 
 def _make_mock_catchment_graph():
     """Create a mock CatchmentGraph with 3 nodes for testing."""
     cg = CatchmentGraph()
-    n = 3
-    cg._n = n
+    cg._n = 3
     cg._loaded = True
 
-    cg._segment_idx = np.array([10, 11, 12], dtype=np.int32)
-    cg._threshold_m2 = np.array([10000, 10000, 10000], dtype=np.int32)
-    cg._area_km2 = np.array([2.0, 3.0, 5.0], dtype=np.float32)
-    cg._elev_min = np.array([140.0, 150.0, 120.0], dtype=np.float32)
-    cg._elev_max = np.array([180.0, 190.0, 160.0], dtype=np.float32)
-    cg._elev_mean = np.array([160.0, 170.0, 140.0], dtype=np.float32)
-    cg._slope_mean = np.array([4.0, 5.0, 3.0], dtype=np.float32)
-    cg._perimeter_km = np.array([8.0, 10.0, 15.0], dtype=np.float32)
-    cg._stream_length_km = np.array([1.5, 2.0, 3.0], dtype=np.float32)
-    cg._strahler = np.array([1, 1, 2], dtype=np.int8)
-    cg._histograms = [
-        {"base_m": 140, "interval_m": 1, "counts": [10, 20, 30, 20, 10]},
-        {"base_m": 150, "interval_m": 1, "counts": [15, 25, 15]},
-        {"base_m": 120, "interval_m": 1, "counts": [5, 10, 15, 20, 15, 10, 5]},
-    ]
-
-    cg._lookup = {
-        (10000, 10): 0,
-        (10000, 11): 1,
-        (10000, 12): 2,
-    }
-
-    # 10→12, 11→12 (12 is outlet)
-    row = np.array([2, 2], dtype=np.int32)
-    col = np.array([0, 1], dtype=np.int32)
-    data = np.ones(2, dtype=np.int8)
-    cg._upstream_adj = sparse.csr_matrix(
-        (data, (row, col)),
-        shape=(n, n),
-        dtype=np.int8,
-    )
+    cg._segment_idx = _SEG_IDX
+    cg._threshold_m2 = _THRESHOLD
+    cg._area_km2 = _AREA
+    cg._elev_min = _ELEV_MIN
+    cg._elev_max = _ELEV_MAX
+    cg._elev_mean = _ELEV_MEAN
+    cg._slope_mean = _SLOPE
+    cg._perimeter_km = _PERIM
+    cg._stream_length_km = _STREAM_LEN
+    cg._strahler = _STRAHLER
+    cg._histograms = _HISTOGRAMS
+    cg._lookup = _LOOKUP
+    cg._upstream_adj = _UPSTREAM_CSR
 
     return cg
 
 
+# stream_network segment row
+_SEGMENT_ROW = SimpleNamespace(
+    segment_idx=12,
+    strahler_order=2,
+    length_m=3000.0,
+    upstream_area_km2=10.0,
+    downstream_x=639139.0,
+    downstream_y=486706.0,
+)
+
+# FakeSession dispatch table for the endpoint's queries, built once at import
+_DISPATCH: tuple[tuple[tuple[str, ...], FakeResult], ...] = (
+    (("stream_network", "strahler_order"), FakeResult(_SEGMENT_ROW)),
+    # Catchment point lookup
+    (("ST_Contains", "stream_catchments"), FakeResult(SimpleNamespace(segment_idx=12))),
+    # ST_Union boundary
+    (("ST_UnaryUnion",), FakeResult(SimpleNamespace(geom=_BOUNDARY_WKB))),
+    # Outlet endpoint
+    (("ST_EndPoint",), FakeResult(SimpleNamespace(x=639139.0, y=486706.0))),
+    # Main stream GeoJSON
+    (
+        ("ST_AsGeoJSON",),
+        FakeResult(
+            SimpleNamespace(
+                geojson=(
+                    '{"type":"LineString","coordinates":[[21.01,52.23],[21.02,52.24]]}'
+                )
+            )
+        ),
+    ),
+)
+
+
+# Stateless apart from the memo, so one instance serves the module
+_SELECT_STREAM_DB = FakeSession(_DISPATCH)
+
+
 @pytest.fixture
 def mock_db_select_stream():
     """Mock database for graph-based stream selection."""
-    mock_session = MagicMock()
-
-    # Mock stream_network segment result
-    segment_result = MagicMock()
-    segment_result.segment_idx = 12
-    segment_result.strahler_order = 2
-    segment_result.length_m = 3000.0
-    segment_result.upstream_area_km2 = 10.0
-    segment_result.downstream_x = 639139.0
-    segment_result.downstream_y = 486706.0
-
-    # Mock catchment point lookup
-    catchment_result = MagicMock()
-    catchment_result.segment_idx = 12
-
-    # Mock ST_Union boundary (WKB for a simple polygon)
-    from shapely.geometry import MultiPolygon, Polygon
-
-    poly = Polygon(
-        [
-            (639100, 486650),
-            (639200, 486650),
-            (639200, 486750),
-            (639100, 486750),
-            (639100, 486650),
-        ]
-    )
-    multi = MultiPolygon([poly])
-    boundary_wkb = multi.wkb
-
-    boundary_result = MagicMock()
-    boundary_result.geom = boundary_wkb
-
-    # Mock outlet endpoint
-    outlet_result = MagicMock()
-    outlet_result.x = 639139.0
-    outlet_result.y = 486706.0
-
-    # Mock outlet elevation
-    elev_result = MagicMock()
-    elev_result.elevation = 120.0
-
-    # Mock main stream GeoJSON
-    stream_geojson_result = MagicMock()
-    stream_geojson_result.geojson = (
-        '{"type":"LineString","coordinates":[[21.01,52.23],[21.02,52.24]]}'
-    )
-
-    def execute_side_effect(query, params=None):
-        result = MagicMock()
-        query_str = str(query)
-
-        if "ST_ClosestPoint" in query_str:
-            # find_stream_catchment_at_point — no fine threshold data
-            result.fetchone.return_value = None
-        elif "stream_network" in query_str and "ST_DWithin" in query_str:
-            result.fetchone.return_value = segment_result
-        elif "ST_Contains" in query_str and "stream_catchments" in query_str:
-            result.fetchone.return_value = catchment_result
-        elif "ST_UnaryUnion" in query_str:
-            result.fetchone.return_value = boundary_result
-        elif "ST_EndPoint" in query_str:
-            result.fetchone.return_value = outlet_result
-        elif "elevation" in query_str and "is_stream" in query_str:
-            result.fetchone.return_value = elev_result
-        elif "ST_AsGeoJSON" in query_str:
-            result.fetchone.return_value = stream_geojson_result
-        elif "land_cover" in query_str:
-            result.fetchall.return_value = []
-            result.fetchone.return_value = None
-        else:
-            result.fetchone.return_value = None
-            result.fetchall.return_value = []
-        return result
-
-    mock_session.execute.side_effect = execute_side_effect
-    return mock_session
+    return _SELECT_STREAM_DB
+
+
+@pytest.fixture(autouse=True)
+def _db_override(override_db):
+    """Default to a DB with no rows (reset by the conftest); tests may replace it."""
+    override_db(FakeSession())
+
+
+@pytest.fixture(scope="module")
+def cg():
+    """Mock 3-node graph, built once per module (the endpoint only reads it)."""
+    return _make_mock_catchment_graph()
+
+
+@pytest.fixture(autouse=True)
+def patch_graph(monkeypatch, cg):
+    """Serve the mock 3-node graph instead of the lifespan-loaded one."""
+    monkeypatch.setattr("api.endpoints.select_stream.get_catchment_graph", lambda: cg)
+
+
+@pytest.fixture
+def unloaded_graph(monkeypatch):
+    """Override patch_graph with a graph that was never loaded."""
+    cg = CatchmentGraph()
+    monkeypatch.setattr("api.endpoints.select_stream.get_catchment_graph", lambda: cg)
+
+
+@pytest.fixture
+def display_threshold_graph(monkeypatch):
+    """Override patch_graph with the 3-node graph at the display threshold only."""
+    cg = _make_mock_catchment_graph()
+    cg._threshold_m2 = np.full(3, DEFAULT_THRESHOLD_M2, dtype=np.int32)
+    cg._lookup = {(DEFAULT_THRESHOLD_M2, seg): i for (_, seg), i in _LOOKUP.items()}
+    monkeypatch.setattr("api.endpoints.select_stream.get_catchment_graph", lambda: cg)
 
 
 class TestSelectStreamEndpoint:
     """Tests for POST /api/select-stream."""
 
-    def test_success_returns_200(self, client, mock_db_select_stream):
+    def test_success_returns_200(self, client, override_db, mock_db_select_stream):
         """Test successful stream selection returns 200."""
-        cg = _make_mock_catchment_graph()
-
-        with patch(
-            "api.endpoints.select_stream.get_catchment_graph",
-            return_value=cg,
-        ):
-            app.dependency_overrides[get_db] = lambda: mock_db_select_stream
-
-            response = client.post(
-                "/api/select-stream",
-                json={
-                    "latitude": 52.23,
-                    "longitude": 21.01,
-                    "threshold_m2": 10000,
-                },
-            )
+        override_db(mock_db_select_stream)
 
-            assert response.status_code == 200
-            app.dependency_overrides.clear()
+        response = client.post(
+            "/api/select-stream",
+            json={
+                "latitude": 52.23,
+                "longitude": 21.01,
+                "threshold_m2": 10000,
+            },
+        )
 
-    def test_response_has_watershed(self, client, mock_db_select_stream):
-        """Test response contains watershed field with full stats."""
-        cg = _make_mock_catchment_graph()
-
-        with patch(
-            "api.endpoints.select_stream.get_catchment_graph",
-            return_value=cg,
-        ):
-            app.dependency_overrides[get_db] = lambda: mock_db_select_stream
-
-            response = client.post(
-                "/api/select-stream",
-                json={
-                    "latitude": 52.23,
-                    "longitude": 21.01,
-                    "threshold_m2": 10000,
-                },
-            )
+        assert response.status_code == 200
 
-            data = response.json()
-            assert "watershed" in data
-            assert data["watershed"] is not None
-            assert "boundary_geojson" in data["watershed"]
-            assert "outlet" in data["watershed"]
-            assert "area_km2" in data["watershed"]
-            assert "hydrograph_available" in data["watershed"]
+    def test_response_has_watershed(self, client, override_db, mock_db_select_stream):
+        """Test response contains watershed field with full stats."""
+        override_db(mock_db_select_stream)
 
-            app.dependency_overrides.clear()
+        response = client.post(
+            "/api/select-stream",
+            json={
+                "latitude": 52.23,
+                "longitude": 21.01,
+                "threshold_m2": 10000,
+            },
+        )
 
-    def test_morphometric_parameters_present(self, client, mock_db_select_stream):
+        data = response.json()
+        assert "watershed" in data
+        assert data["watershed"] is not None
+        assert "boundary_geojson" in data["watershed"]
+        assert "outlet" in data["watershed"]
+        assert "area_km2" in data["watershed"]
+        assert "hydrograph_available" in data["watershed"]
+
+    def test_morphometric_parameters_present(
+        self, client, override_db, mock_db_select_stream
+    ):
         """Test watershed.morphometry has key parameters."""
-        cg = _make_mock_catchment_graph()
-
-        with patch(
-            "api.endpoints.select_stream.get_catchment_graph",
-            return_value=cg,
-        ):
-            app.dependency_overrides[get_db] = lambda: mock_db_select_stream
-
-            response = client.post(
-                "/api/select-stream",
-                json={
-                    "latitude": 52.23,
-                    "longitude": 21.01,
-                    "threshold_m2": 10000,
-                },
-            )
-
-            data = response.json()
-            morph = data["watershed"]["morphometry"]
-            assert morph is not None
-            assert "area_km2" in morph
-            assert "perimeter_km" in morph
-            assert "elevation_min_m" in morph
-            assert "elevation_max_m" in morph
-            assert "elevation_mean_m" in morph
-            assert morph["area_km2"] > 0
-            assert morph["drainage_density_km_per_km2"] is not None
+        override_db(mock_db_select_stream)
 
-            app.dependency_overrides.clear()
+        response = client.post(
+            "/api/select-stream",
+            json={
+                "latitude": 52.23,
+                "longitude": 21.01,
+                "threshold_m2": 10000,
+            },
+        )
 
-    def test_upstream_segments_present(self, client, mock_db_select_stream):
+        data = response.json()
+        morph = data["watershed"]["morphometry"]
+        assert morph is not None
+        assert "area_km2" in morph
+        assert "perimeter_km" in morph
+        assert "elevation_min_m" in morph
+        assert "elevation_max_m" in morph
+        assert "elevation_mean_m" in morph
+        assert morph["area_km2"] > 0
+        assert morph["drainage_density_km_per_km2"] is not None
+
+    def test_upstream_segments_present(
+        self, client, override_db, mock_db_select_stream
+    ):
         """Test upstream_segment_indices is returned."""
-        cg = _make_mock_catchment_graph()
-
-        with patch(
-            "api.endpoints.select_stream.get_catchment_graph",
-            return_value=cg,
-        ):
-            app.dependency_overrides[get_db] = lambda: mock_db_select_stream
-
-            response = client.post(
-                "/api/select-stream",
-                json={
-                    "latitude": 52.23,
-                    "longitude": 21.01,
-                    "threshold_m2": 10000,
-                },
-            )
+        override_db(mock_db_select_stream)
 
-            data = response.json()
-            assert "upstream_segment_indices" in data
-            assert isinstance(data["upstream_segment_indices"], list)
-            assert len(data["upstream_segment_indices"]) > 0
-            # Should contain all 3 segments (10, 11, 12) since we start from 12
-            assert sorted(data["upstream_segment_indices"]) == [10, 11, 12]
+        response = client.post(
+            "/api/select-stream",
+            json={
+                "latitude": 52.23,
+                "longitude": 21.01,
+                "threshold_m2": 10000,
+            },
+        )
 
-            app.dependency_overrides.clear()
+        data = response.json()
+        assert "upstream_segment_indices" in data
+        assert isinstance(data["upstream_segment_indices"], list)
+        assert len(data["upstream_segment_indices"]) > 0
+        # Should contain all 3 segments (10, 11, 12) since we start from 12
+        assert sorted(data["upstream_segment_indices"]) == [10, 11, 12]
 
-    def test_no_stream_returns_404(self, client):
+    def test_no_stream_returns_404(self, client, override_db):
         """Test that missing stream returns 404."""
-        cg = _make_mock_catchment_graph()
-        mock_session = MagicMock()
-        mock_session.execute.return_value.fetchone.return_value = None
-
-        with patch(
-            "api.endpoints.select_stream.get_catchment_graph",
-            return_value=cg,
-        ):
-            app.dependency_overrides[get_db] = lambda: mock_session
-
-            response = client.post(
-                "/api/select-stream",
-                json={
-                    "latitude": 52.0,
-                    "longitude": 21.0,
-                    "threshold_m2": 10000,
-                },
-            )
+        override_db(FakeSession())
 
-            assert response.status_code == 404
-            assert "Nie znaleziono zlewni" in response.json()["detail"]
+        response = client.post(
+            "/api/select-stream",
+            json={
+                "latitude": 52.0,
+                "longitude": 21.0,
+                "threshold_m2": 10000,
+            },
+        )
 
-            app.dependency_overrides.clear()
+        assert response.status_code == 404
+        assert "Nie znaleziono zlewni" in response.json()["detail"]
 
-    def test_graph_not_loaded_returns_503(self, client):
+    def test_graph_not_loaded_returns_503(self, client, override_db, unloaded_graph):
         """Test that unloaded graph returns 503."""
-        cg = CatchmentGraph()  # Not loaded
-        mock_session = MagicMock()
-
-        # Need stream to be found first
-        segment_result = MagicMock()
-        segment_result.segment_idx = 12
-        segment_result.strahler_order = 2
-        segment_result.length_m = 3000.0
-        segment_result.upstream_area_km2 = 10.0
-        segment_result.downstream_x = 639139.0
-        segment_result.downstream_y = 486706.0
-        mock_session.execute.return_value.fetchone.return_value = segment_result
-
-        with patch(
-            "api.endpoints.select_stream.get_catchment_graph",
-            return_value=cg,
-        ):
-            app.dependency_overrides[get_db] = lambda: mock_session
-
-            response = client.post(
-                "/api/select-stream",
-                json={
-                    "latitude": 52.23,
-                    "longitude": 21.01,
-                    "threshold_m2": 10000,
-                },
-            )
+        # Need stream to be found first: every query returns the segment
+        override_db(FakeSession((((), FakeResult(_SEGMENT_ROW)),)))
 
-            assert response.status_code == 503
+        response = client.post(
+            "/api/select-stream",
+            json={
+                "latitude": 52.23,
+                "longitude": 21.01,
+                "threshold_m2": 10000,
+            },
+        )
 
-            app.dependency_overrides.clear()
+        assert response.status_code == 503
 
     def test_invalid_coordinates_returns_422(self, client):
         """Test that latitude=200 returns 422."""
@@ -343,120 +321,43 @@ class TestSelectStreamEndpoint:
 
         assert response.status_code == 422
 
-    def test_fallback_to_display_threshold(self, client):
-        """Test fallback when fine threshold has no data at click point."""
-        cg = _make_mock_catchment_graph()
-
-        mock_session = MagicMock()
-
-        segment_result = MagicMock()
-        segment_result.segment_idx = 12
-        segment_result.strahler_order = 2
-        segment_result.length_m = 3000.0
-        segment_result.upstream_area_km2 = 10.0
-        segment_result.downstream_x = 639139.0
-        segment_result.downstream_y = 486706.0
-
-        catchment_result = MagicMock()
-        catchment_result.segment_idx = 12
+    def test_fallback_to_display_threshold(
+        self, client, override_db, mock_db_select_stream, display_threshold_graph
+    ):
+        """Test fallback when the fine threshold has no catchments."""
+        override_db(mock_db_select_stream)
 
-        from shapely.geometry import MultiPolygon, Polygon
-
-        poly = Polygon(
-            [
-                (639100, 486650),
-                (639200, 486650),
-                (639200, 486750),
-                (639100, 486750),
-                (639100, 486650),
-            ]
-        )
-        multi = MultiPolygon([poly])
-        boundary_wkb = multi.wkb
-
-        boundary_result = MagicMock()
-        boundary_result.geom = boundary_wkb
-
-        outlet_result = MagicMock()
-        outlet_result.x = 639139.0
-        outlet_result.y = 486706.0
-
-        stream_geojson_result = MagicMock()
-        stream_geojson_result.geojson = (
-            '{"type":"LineString","coordinates":[[21.01,52.23],[21.02,52.24]]}'
+        response = client.post(
+            "/api/select-stream",
+            json={
+                "latitude": 52.23,
+                "longitude": 21.01,
+                "threshold_m2": 100,
+            },
         )
 
-        def execute_side_effect_fallback(query, params=None):
-            result = MagicMock()
-            query_str = str(query)
-
-            if "ST_ClosestPoint" in query_str:
-                # Fine threshold has no data → returns None
-                result.fetchone.return_value = None
-            elif "stream_network" in query_str and "ST_DWithin" in query_str:
-                result.fetchone.return_value = segment_result
-            elif "ST_Contains" in query_str and "stream_catchments" in query_str:
-                # Fallback to display threshold
-                result.fetchone.return_value = catchment_result
-            elif "ST_UnaryUnion" in query_str:
-                result.fetchone.return_value = boundary_result
-            elif "ST_EndPoint" in query_str:
-                result.fetchone.return_value = outlet_result
-            elif "ST_AsGeoJSON" in query_str:
-                result.fetchone.return_value = stream_geojson_result
-            elif "land_cover" in query_str:
-                result.fetchall.return_value = []
-                result.fetchone.return_value = None
-            else:
-                result.fetchone.return_value = None
-                result.fetchall.return_value = []
-            return result
-
-        mock_session.execute.side_effect = execute_side_effect_fallback
-
-        with patch(
-            "api.endpoints.select_stream.get_catchment_graph",
-            return_value=cg,
-        ):
-            app.dependency_overrides[get_db] = lambda: mock_session
-
-            response = client.post(
-                "/api/select-stream",
-                json={
-                    "latitude": 52.23,
-                    "longitude": 21.01,
-                    "threshold_m2": 10000,
-                },
-            )
+        assert response.status_code == 200
+        data = response.json()
+        # Selected from the display threshold graph nodes instead
+        assert data["display_threshold_m2"] == DEFAULT_THRESHOLD_M2
+        assert sorted(data["upstream_segment_indices"]) == [10, 11, 12]
+        assert "niedostępne dla progu 100" in data["info_message"]
 
-            assert response.status_code == 200
-            data = response.json()
-            # Falls back to display threshold — same as old behavior
-            assert sorted(data["upstream_segment_indices"]) == [10, 11, 12]
-
-            app.dependency_overrides.clear()
-
-    def test_display_threshold_matches_request(self, client, mock_db_select_stream):
+    def test_display_threshold_matches_request(
+        self, client, override_db, mock_db_select_stream
+    ):
         """Test display_threshold_m2 in response matches request threshold."""
-        cg = _make_mock_catchment_graph()
-
-        with patch(
-            "api.endpoints.select_stream.get_catchment_graph",
-            return_value=cg,
-        ):
-            app.dependency_overrides[get_db] = lambda: mock_db_select_stream
-
-            response = client.post(
-                "/api/select-stream",
-                json={
-                    "latitude": 52.23,
-                    "longitude": 21.01,
-                    "threshold_m2": 10000,
-                },
-            )
+        override_db(mock_db_select_stream)
 
-            assert response.status_code == 200
-            data = response.json()
-            assert data["display_threshold_m2"] == 10000
+        response = client.post(
+            "/api/select-stream",
+            json={
+                "latitude": 52.23,
+                "longitude": 21.01,
+                "threshold_m2": 10000,
+            },
+        )
 
-            app.dependency_overrides.clear()
+        assert response.status_code == 200
+        data = response.json()
+        assert data["display_threshold_m2"] == 10000
@@ -5,16 +5,17 @@ Integration tests for tile (MVT) endpoints.
 from unittest.mock import MagicMock
 
 import pytest
-from fastapi.testclient import TestClient
 
-from api.main import app
-from core.database import get_db
+from api.endpoints.tiles import _CachedTile, _tile_response, clear_tile_cache
+from tests.fakes import FakeResult, FakeSession
 
 
-@pytest.fixture
-def client():
-    """Create test client."""
-    return TestClient(app)
+@pytest.fixture(autouse=True)
+def _empty_tile_cache():
+    """Start every test with a cold tile cache, so each mock DB is queried."""
+    clear_tile_cache()
+    yield
+    clear_tile_cache()
 
 
 @pytest.fixture
@@ -29,6 +30,29 @@ def mock_db_with_tile():
     return mock_session
 
 
+# Above the 500-byte gzip threshold, and compressible
+_LARGE_TILE = b"\x1a\x00" * 1000
+
+
+@pytest.fixture
+def mock_db_with_large_tile():
+    """Mock database returning a tile large enough to be gzip-cached."""
+    mock_session = MagicMock()
+    row = MagicMock()
+    row.__getitem__ = lambda self, idx: _LARGE_TILE if idx == 0 else None
+    mock_session.execute.return_value.fetchone.return_value = row
+    return mock_session
+
+
+def _vary_tokens(response) -> set[str]:
+    """Header names listed in the response's Vary header(s)."""
+    return {
+        token.strip()
+        for value in response.headers.get_list("Vary")
+        for token in value.split(",")
+    }
+
+
 @pytest.fixture
 def mock_db_empty_tile():
     """Mock database returning empty/null tile."""
@@ -50,196 +74,355 @@ def mock_db_no_tile():
 @pytest.fixture
 def mock_db_with_thresholds():
     """Mock database returning threshold values."""
-    mock_session = MagicMock()
-
-    streams_rows = [MagicMock(), MagicMock(), MagicMock()]
-    for r, v in zip(streams_rows, [1000, 10000, 100000], strict=False):
-        r.__getitem__ = lambda self, idx, val=v: val if idx == 0 else None
-
-    catchments_rows = [MagicMock(), MagicMock()]
-    for r, v in zip(catchments_rows, [1000, 10000], strict=False):
-        r.__getitem__ = lambda self, idx, val=v: val if idx == 0 else None
-
-    def execute_side_effect(query, params=None):
-        result = MagicMock()
-        query_str = str(query)
-        if "stream_network" in query_str:
-            result.fetchall.return_value = streams_rows
-        elif "stream_catchments" in query_str:
-            result.fetchall.return_value = catchments_rows
-        return result
-
-    mock_session.execute.side_effect = execute_side_effect
-    return mock_session
+    return FakeSession(
+        (
+            (("stream_network",), FakeResult(rows=((1000,), (10000,), (100000,)))),
+            (("stream_catchments",), FakeResult(rows=((1000,), (10000,)))),
+        )
+    )
 
 
 class TestStreamsMVT:
     """Tests for GET /api/tiles/streams/{z}/{x}/{y}.pbf."""
 
-    def test_returns_200(self, client, mock_db_with_tile):
+    def test_returns_200(self, client, override_db, mock_db_with_tile):
         """Test successful tile request returns 200."""
-        app.dependency_overrides[get_db] = lambda: mock_db_with_tile
+        override_db(mock_db_with_tile)
 
         response = client.get("/api/tiles/streams/10/550/340.pbf")
 
         assert response.status_code == 200
-        app.dependency_overrides.clear()
 
-    def test_content_type_is_protobuf(self, client, mock_db_with_tile):
+    def test_content_type_is_protobuf(self, client, override_db, mock_db_with_tile):
         """Test response content type is protobuf."""
-        app.dependency_overrides[get_db] = lambda: mock_db_with_tile
+        override_db(mock_db_with_tile)
 
         response = client.get("/api/tiles/streams/10/550/340.pbf")
 
         assert response.headers["content-type"] == "application/x-protobuf"
-        app.dependency_overrides.clear()
 
-    def test_cache_control_header(self, client, mock_db_with_tile):
+    def test_cache_control_header(self, client, override_db, mock_db_with_tile):
         """Test response has cache control header."""
-        app.dependency_overrides[get_db] = lambda: mock_db_with_tile
+        override_db(mock_db_with_tile)
 
         response = client.get("/api/tiles/streams/10/550/340.pbf")
 
         assert "Cache-Control" in response.headers
         assert "max-age" in response.headers["Cache-Control"]
-        app.dependency_overrides.clear()
+        assert "public" in response.headers["Cache-Control"]
+
+    def test_etag_header(self, client, override_db, mock_db_with_tile):
+        """Test response carries a quoted content-hash ETag."""
+        override_db(mock_db_with_tile)
+
+        response = client.get("/api/tiles/streams/10/550/340.pbf")
+
+        etag = response.headers["ETag"]
+        assert etag.startswith('"') and etag.endswith('"')
+
+    def test_matching_etag_returns_304(self, client, override_db, mock_db_with_tile):
+        """Test that If-None-Match with the current ETag returns empty 304."""
+        override_db(mock_db_with_tile)
+        etag = client.get("/api/tiles/streams/10/550/340.pbf").headers["ETag"]
+
+        response = client.get(
+            "/api/tiles/streams/10/550/340.pbf", headers={"If-None-Match": etag}
+        )
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["ETag"] == etag
+
+    def test_weak_etag_returns_304(self, client, override_db, mock_db_with_tile):
+        """Test that a proxy-weakened W/ ETag still revalidates (weak compare)."""
+        override_db(mock_db_with_tile)
+        etag = client.get("/api/tiles/streams/10/550/340.pbf").headers["ETag"]
+
+        response = client.get(
+            "/api/tiles/streams/10/550/340.pbf",
+            headers={"If-None-Match": f'"other", W/{etag}'},
+        )
+
+        assert response.status_code == 304
+        assert response.headers["ETag"] == etag
+
+    def test_wildcard_etag_returns_304(self, client, override_db, mock_db_with_tile):
+        """Test that If-None-Match: * matches any current tile."""
+        override_db(mock_db_with_tile)
+
+        response = client.get(
+            "/api/tiles/streams/10/550/340.pbf", headers={"If-None-Match": "*"}
+        )
+
+        assert response.status_code == 304
+        assert response.content == b""
+
+    def test_stale_etag_returns_200(self, client, override_db, mock_db_with_tile):
+        """Test that If-None-Match with another ETag returns the full tile."""
+        override_db(mock_db_with_tile)
+
+        response = client.get(
+            "/api/tiles/streams/10/550/340.pbf",
+            headers={"If-None-Match": '"0000000000000000"'},
+        )
+
+        assert response.status_code == 200
+        assert response.content == b"\x1a\x00"
 
-    def test_returns_binary_content(self, client, mock_db_with_tile):
+    def test_returns_binary_content(self, client, override_db, mock_db_with_tile):
         """Test response content is bytes."""
-        app.dependency_overrides[get_db] = lambda: mock_db_with_tile
+        override_db(mock_db_with_tile)
 
         response = client.get("/api/tiles/streams/10/550/340.pbf")
 
         assert isinstance(response.content, bytes)
-        app.dependency_overrides.clear()
 
-    def test_empty_tile_returns_200(self, client, mock_db_empty_tile):
+    def test_empty_tile_returns_200(self, client, override_db, mock_db_empty_tile):
         """Test empty tile still returns 200 with empty content."""
-        app.dependency_overrides[get_db] = lambda: mock_db_empty_tile
+        override_db(mock_db_empty_tile)
 
         response = client.get("/api/tiles/streams/10/550/340.pbf")
 
         assert response.status_code == 200
         assert response.content == b""
-        app.dependency_overrides.clear()
 
-    def test_no_row_returns_200_empty(self, client, mock_db_no_tile):
+    def test_no_row_returns_200_empty(self, client, override_db, mock_db_no_tile):
         """Test missing row returns 200 with empty content."""
-        app.dependency_overrides[get_db] = lambda: mock_db_no_tile
+        override_db(mock_db_no_tile)
 
         response = client.get("/api/tiles/streams/10/550/340.pbf")
 
         assert response.status_code == 200
         assert response.content == b""
-        app.dependency_overrides.clear()
 
-    def test_custom_threshold_parameter(self, client, mock_db_with_tile):
+    def test_custom_threshold_parameter(self, client, override_db, mock_db_with_tile):
         """Test custom threshold query parameter."""
-        app.dependency_overrides[get_db] = lambda: mock_db_with_tile
+        override_db(mock_db_with_tile)
 
         response = client.get("/api/tiles/streams/10/550/340.pbf?threshold=1000")
 
         assert response.status_code == 200
-        app.dependency_overrides.clear()
 
-    def test_default_threshold_is_10000(self, client, mock_db_with_tile):
+    def test_default_threshold_is_10000(self, client, override_db, mock_db_with_tile):
         """Test that default threshold is 10000."""
-        app.dependency_overrides[get_db] = lambda: mock_db_with_tile
+        override_db(mock_db_with_tile)
 
         # Just verify the request succeeds without explicit threshold
         response = client.get("/api/tiles/streams/10/550/340.pbf")
 
         assert response.status_code == 200
-        app.dependency_overrides.clear()
 
-    def test_threshold_must_be_positive(self, client):
-        """Test that threshold < 1 returns 422."""
+    def test_threshold_must_be_positive(self, client, override_db, mock_db_with_tile):
+        """Test that threshold < 1 returns 422 without querying the DB."""
+        override_db(mock_db_with_tile)
+
         response = client.get("/api/tiles/streams/10/550/340.pbf?threshold=0")
 
         assert response.status_code == 422
+        mock_db_with_tile.execute.assert_not_called()
 
-    def test_different_zoom_levels(self, client, mock_db_with_tile):
+    @pytest.mark.parametrize("z", [0, 5, 10, 15, 18])
+    def test_zoom_level(self, client, override_db, mock_db_with_tile, z):
         """Test various zoom levels work."""
-        app.dependency_overrides[get_db] = lambda: mock_db_with_tile
+        override_db(mock_db_with_tile)
 
-        for z in [0, 5, 10, 15, 18]:
-            response = client.get(f"/api/tiles/streams/{z}/0/0.pbf")
-            assert response.status_code == 200, f"Failed for zoom={z}"
+        response = client.get(f"/api/tiles/streams/{z}/0/0.pbf")
 
-        app.dependency_overrides.clear()
+        assert response.status_code == 200
 
 
 class TestCatchmentsMVT:
     """Tests for GET /api/tiles/catchments/{z}/{x}/{y}.pbf."""
 
-    def test_returns_200(self, client, mock_db_with_tile):
+    def test_returns_200(self, client, override_db, mock_db_with_tile):
         """Test successful catchment tile returns 200."""
-        app.dependency_overrides[get_db] = lambda: mock_db_with_tile
+        override_db(mock_db_with_tile)
 
         response = client.get("/api/tiles/catchments/10/550/340.pbf")
 
         assert response.status_code == 200
-        app.dependency_overrides.clear()
 
-    def test_content_type_is_protobuf(self, client, mock_db_with_tile):
+    def test_content_type_is_protobuf(self, client, override_db, mock_db_with_tile):
         """Test response content type is protobuf."""
-        app.dependency_overrides[get_db] = lambda: mock_db_with_tile
+        override_db(mock_db_with_tile)
 
         response = client.get("/api/tiles/catchments/10/550/340.pbf")
 
         assert response.headers["content-type"] == "application/x-protobuf"
-        app.dependency_overrides.clear()
 
-    def test_cache_control_header(self, client, mock_db_with_tile):
+    def test_cache_control_header(self, client, override_db, mock_db_with_tile):
         """Test response has cache control header."""
-        app.dependency_overrides[get_db] = lambda: mock_db_with_tile
+        override_db(mock_db_with_tile)
 
         response = client.get("/api/tiles/catchments/10/550/340.pbf")
 
         assert "Cache-Control" in response.headers
-        app.dependency_overrides.clear()
 
-    def test_empty_tile_returns_200(self, client, mock_db_empty_tile):
+    def test_empty_tile_returns_200(self, client, override_db, mock_db_empty_tile):
         """Test empty catchment tile returns 200."""
-        app.dependency_overrides[get_db] = lambda: mock_db_empty_tile
+        override_db(mock_db_empty_tile)
 
         response = client.get("/api/tiles/catchments/10/550/340.pbf")
 
         assert response.status_code == 200
         assert response.content == b""
-        app.dependency_overrides.clear()
 
-    def test_custom_threshold(self, client, mock_db_with_tile):
+    def test_custom_threshold(self, client, override_db, mock_db_with_tile):
         """Test custom threshold for catchment tiles."""
-        app.dependency_overrides[get_db] = lambda: mock_db_with_tile
+        override_db(mock_db_with_tile)
 
         response = client.get("/api/tiles/catchments/10/550/340.pbf?threshold=100000")
 
         assert response.status_code == 200
-        app.dependency_overrides.clear()
 
-    def test_threshold_must_be_positive(self, client):
-        """Test that threshold < 1 returns 422."""
+    def test_threshold_must_be_positive(self, client, override_db, mock_db_with_tile):
+        """Test that threshold < 1 returns 422 without querying the DB."""
+        override_db(mock_db_with_tile)
+
         response = client.get("/api/tiles/catchments/10/550/340.pbf?threshold=0")
 
         assert response.status_code == 422
+        mock_db_with_tile.execute.assert_not_called()
+
+
+class TestTileCache:
+    """Tests for the in-process MVT tile cache."""
+
+    def test_repeated_tile_queries_db_once(
+        self, client, override_db, mock_db_with_tile
+    ):
+        """Test that a second request for the same tile is served from cache."""
+        override_db(mock_db_with_tile)
+
+        first = client.get("/api/tiles/streams/10/550/340.pbf")
+        second = client.get("/api/tiles/streams/10/550/340.pbf")
+
+        assert first.content == second.content == b"\x1a\x00"
+        assert mock_db_with_tile.execute.call_count == 1
+
+    def test_cache_key_includes_layer_and_threshold(
+        self, client, override_db, mock_db_with_tile
+    ):
+        """Test that other layers and thresholds are not served from cache."""
+        override_db(mock_db_with_tile)
+
+        client.get("/api/tiles/streams/10/550/340.pbf")
+        client.get("/api/tiles/streams/10/550/340.pbf?threshold=1000")
+        client.get("/api/tiles/catchments/10/550/340.pbf")
+
+        assert mock_db_with_tile.execute.call_count == 3
+
+    def test_clear_tile_cache(self, client, override_db, mock_db_with_tile):
+        """Test that clear_tile_cache forces the next request to query again."""
+        override_db(mock_db_with_tile)
+
+        client.get("/api/tiles/streams/10/550/340.pbf")
+        clear_tile_cache()
+        client.get("/api/tiles/streams/10/550/340.pbf")
+
+        assert mock_db_with_tile.execute.call_count == 2
+
+
+class TestTileCompression:
+    """Tests for the pre-compressed (gzip) tile encoding."""
+
+    def test_large_tile_served_gzipped(
+        self, client, override_db, mock_db_with_large_tile
+    ):
+        """Test that a gzip-accepting client gets the compressed payload."""
+        override_db(mock_db_with_large_tile)
+
+        response = client.get(
+            "/api/tiles/streams/10/550/340.pbf",
+            headers={"Accept-Encoding": "gzip"},
+        )
+
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in _vary_tokens(response)
+        assert int(response.headers["Content-Length"]) < len(_LARGE_TILE)
+        # httpx decodes the body transparently
+        assert response.content == _LARGE_TILE
+
+    def test_large_tile_identity_without_accept_encoding(
+        self, client, override_db, mock_db_with_large_tile
+    ):
+        """Test that a client without gzip support gets the raw payload."""
+        override_db(mock_db_with_large_tile)
+
+        response = client.get(
+            "/api/tiles/streams/10/550/340.pbf",
+            headers={"Accept-Encoding": "identity"},
+        )
+
+        assert "Content-Encoding" not in response.headers
+        # Set by the endpoint, whether or not GZipMiddleware adds it too
+        assert "Accept-Encoding" in _vary_tokens(response)
+        assert response.content == _LARGE_TILE
+
+    def test_identity_variant_sets_vary_itself(self):
+        """Test that Vary does not depend on GZipMiddleware (older Starlette)."""
+        tile = _CachedTile(_LARGE_TILE, b"gz", '"abc"')
+
+        response = _tile_response(tile, None, "identity")
+
+        assert response.headers["Vary"] == "Accept-Encoding"
+
+    def test_not_modified_gzip_tile_varies_by_encoding(
+        self, client, override_db, mock_db_with_large_tile
+    ):
+        """Test that a 304 for a gzip-cached tile still carries Vary."""
+        override_db(mock_db_with_large_tile)
+        url = "/api/tiles/streams/10/550/340.pbf"
+        etag = client.get(url, headers={"Accept-Encoding": "gzip"}).headers["ETag"]
+
+        response = client.get(
+            url, headers={"Accept-Encoding": "gzip", "If-None-Match": etag}
+        )
+
+        assert response.status_code == 304
+        assert "Accept-Encoding" in _vary_tokens(response)
+
+    def test_small_tile_does_not_vary(self, client, override_db, mock_db_with_tile):
+        """Test that a tile without a gzip copy does not vary by encoding."""
+        override_db(mock_db_with_tile)
+
+        response = client.get(
+            "/api/tiles/streams/10/550/340.pbf",
+            headers={"Accept-Encoding": "gzip"},
+        )
+
+        assert "Accept-Encoding" not in _vary_tokens(response)
+
+    def test_encodings_have_distinct_etags(
+        self, client, override_db, mock_db_with_large_tile
+    ):
+        """Test that gzip and identity responses carry different ETags."""
+        override_db(mock_db_with_large_tile)
+        url = "/api/tiles/streams/10/550/340.pbf"
+
+        gzip_etag = client.get(url, headers={"Accept-Encoding": "gzip"}).headers["ETag"]
+        identity_etag = client.get(
+            url, headers={"Accept-Encoding": "identity"}
+        ).headers["ETag"]
+
+        assert gzip_etag != identity_etag
+        assert mock_db_with_large_tile.execute.call_count == 1
 
 
 class TestThresholdsEndpoint:
     """Tests for GET /api/tiles/thresholds."""
 
-    def test_returns_200(self, client, mock_db_with_thresholds):
+    def test_returns_200(self, client, override_db, mock_db_with_thresholds):
         """Test thresholds endpoint returns 200."""
-        app.dependency_overrides[get_db] = lambda: mock_db_with_thresholds
+        override_db(mock_db_with_thresholds)
 
         response = client.get("/api/tiles/thresholds")
 
         assert response.status_code == 200
-        app.dependency_overrides.clear()
 
-    def test_response_structure(self, client, mock_db_with_thresholds):
+    def test_response_structure(self, client, override_db, mock_db_with_thresholds):
         """Test response has streams and catchments keys."""
-        app.dependency_overrides[get_db] = lambda: mock_db_with_thresholds
+        override_db(mock_db_with_thresholds)
 
         response = client.get("/api/tiles/thresholds")
         data = response.json()
@@ -248,30 +431,20 @@ class TestThresholdsEndpoint:
         assert "catchments" in data
         assert isinstance(data["streams"], list)
         assert isinstance(data["catchments"], list)
-        app.dependency_overrides.clear()
 
-    def test_threshold_values(self, client, mock_db_with_thresholds):
+    def test_threshold_values(self, client, override_db, mock_db_with_thresholds):
         """Test that returned thresholds match mock data."""
-        app.dependency_overrides[get_db] = lambda: mock_db_with_thresholds
+        override_db(mock_db_with_thresholds)
 
         response = client.get("/api/tiles/thresholds")
         data = response.json()
 
         assert data["streams"] == [1000, 10000, 100000]
         assert data["catchments"] == [1000, 10000]
-        app.dependency_overrides.clear()
 
-    def test_empty_thresholds(self, client):
+    def test_empty_thresholds(self, client, override_db):
         """Test with database returning no thresholds."""
-        mock_session = MagicMock()
-
-        def execute_side_effect(query, params=None):
-            result = MagicMock()
-            result.fetchall.return_value = []
-            return result
-
-        mock_session.execute.side_effect = execute_side_effect
-        app.dependency_overrides[get_db] = lambda: mock_session
+        override_db(FakeSession())
 
         response = client.get("/api/tiles/thresholds")
         data = response.json()
@@ -279,29 +452,17 @@ class TestThresholdsEndpoint:
         assert response.status_code == 200
         assert data["streams"] == []
         assert data["catchments"] == []
-        app.dependency_overrides.clear()
 
-    def test_catchments_table_missing_graceful(self, client):
+    def test_catchments_table_missing_graceful(self, client, override_db):
         """Test graceful handling when stream_catchments table doesn't exist."""
-        mock_session = MagicMock()
-        call_count = 0
-
-        def execute_side_effect(query, params=None):
-            nonlocal call_count
-            result = MagicMock()
-            call_count += 1
-            if call_count == 1:
-                # stream_network returns data
-                row = MagicMock()
-                row.__getitem__ = lambda self, idx: 10000 if idx == 0 else None
-                result.fetchall.return_value = [row]
-            else:
-                # stream_catchments raises
-                raise Exception("relation does not exist")
-            return result
-
-        mock_session.execute.side_effect = execute_side_effect
-        app.dependency_overrides[get_db] = lambda: mock_session
+        override_db(
+            FakeSession(
+                (
+                    (("stream_network",), FakeResult(rows=((10000,),))),
+                    (("stream_catchments",), Exception("relation does not exist")),
+                )
+            )
+        )
 
         response = client.get("/api/tiles/thresholds")
         data = response.json()
@@ -309,4 +470,3 @@ class TestThresholdsEndpoint:
         assert response.status_code == 200
         assert data["streams"] == [10000]
         assert data["catchments"] == []
-        app.dependency_overrides.clear()
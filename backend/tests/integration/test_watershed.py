@@ -1,13 +1,13 @@
 """
 Integration tests for watershed delineation endpoint.
 
-Tests the POST /api/delineate-watershed endpoint using mocked
+Tests the POST /api/delineate-watershed endpoint using fake
 CatchmentGraph and watershed_service functions. The endpoint
 flow is:
   1. Transform coords (WGS84 -> PL-1992)
   2. Get CatchmentGraph (503 if not loaded)
   3. cg.find_catchment_at_point -> clicked_idx (404 if ValueError)
-  4. cg._segment_idx[clicked_idx] -> segment_idx
+  4. cg.get_segment_idx(clicked_idx) -> segment_idx
   5. get_stream_info_by_segment_idx -> segment dict
   6. cg.traverse_upstream -> upstream_indices (numpy array)
   7. cg.get_segment_indices -> segment_idxs list
@@ -19,33 +19,22 @@ flow is:
  13. build_morph_dict_from_graph -> morph_dict
 """
 
-import contextlib
-from unittest.mock import MagicMock, patch
-
-import numpy as np
 import pytest
-from fastapi.testclient import TestClient
 from shapely.geometry import MultiPolygon, Polygon
 
-from api.main import app
-from core.catchment_graph import CatchmentGraph
-
+from api.endpoints import watershed as _ws_mod
+from tests.fakes import (
+    FakeCG,
+    FakeSession,
+    NoCatchmentCG,
+    apply_patches,
+    returning,
+)
 
-@pytest.fixture
-def client():
-    """Create test client."""
-    return TestClient(app)
 
-
-def _make_mock_cg(area_km2: float = 10.0) -> MagicMock:
-    """Create a mock CatchmentGraph with sensible defaults."""
-    cg = MagicMock(spec=CatchmentGraph)
-    cg.loaded = True
-    cg._segment_idx = np.array([10, 11, 12], dtype=np.int32)
-    cg.find_catchment_at_point.return_value = 0  # internal idx
-    cg.traverse_upstream.return_value = np.array([0, 1, 2])
-    cg.get_segment_indices.return_value = [10, 11, 12]
-    cg.aggregate_stats.return_value = {
+def _make_stats(area_km2: float = 10.0) -> dict:
+    """Create aggregate_stats() output for a watershed of ``area_km2``."""
+    return {
         "area_km2": area_km2,
         "elevation_min_m": 120.0,
         "elevation_max_m": 190.0,
@@ -56,8 +45,11 @@ def _make_mock_cg(area_km2: float = 10.0) -> MagicMock:
         "max_strahler_order": 2,
         "stream_frequency_per_km2": 0.3,
     }
-    cg.aggregate_hypsometric.return_value = []
-    return cg
+
+
+def _make_mock_cg(area_km2: float = 10.0) -> FakeCG:
+    """Create a fake CatchmentGraph for a watershed of ``area_km2``."""
+    return FakeCG(_make_stats(area_km2), segment_idx=12)
 
 
 def _make_segment() -> dict:
@@ -115,83 +107,96 @@ def _make_morph_dict(area_km2: float = 10.0) -> dict:
     }
 
 
-# Patch target prefix for the watershed endpoint module
-_WS = "api.endpoints.watershed"
+# Default payloads, built once: the endpoint only reads them
+_SEGMENT = _make_segment()
+_BOUNDARY = _make_boundary()
+_MORPH = _make_morph_dict()
 
 
-class TestDelineateWatershedEndpoint:
-    """Tests for POST /api/delineate-watershed."""
+# Every DB-backed helper the endpoint calls is patched, so the session
+# is only passed through; one instance serves the module
+_EMPTY_DB = FakeSession()
+
+
+@pytest.fixture(autouse=True)
+def _db_override(override_db):
+    """Install the shared DB stub (reset by the conftest)."""
+    override_db(_EMPTY_DB)
+
+
+def _patch_happy_path() -> dict:
+    """
+    Return replacements for a successful delineation.
+
+    Maps each of the 7 external functions the endpoint calls to a
+    stand-in backed by the shared defaults; install them with
+    ``apply_patches``. Tests needing other values re-patch on top.
+    """
+    return {
+        "get_catchment_graph": returning(_make_mock_cg()),
+        "get_stream_info_by_segment_idx": returning(_SEGMENT),
+        "merge_catchment_boundaries": returning(_BOUNDARY),
+        "get_segment_outlet": returning({"x": 639139.0, "y": 486706.0}),
+        "build_morph_dict_from_graph": returning(_MORPH),
+        "get_main_stream_geojson": returning(None),
+        "get_land_cover_for_boundary": returning(None),
+    }
+
 
-    def _patch_all(
-        self,
-        cg=None,
-        segment=None,
-        boundary=None,
-        morph=None,
-    ):
-        """Create a list of context managers for all required patches.
-
-        Parameters
-        ----------
-        cg : MagicMock | None
-            Mock CatchmentGraph instance (defaults to _make_mock_cg())
-        segment : dict | None
-            Mock segment dict (defaults to _make_segment())
-        boundary : MultiPolygon | None
-            Mock boundary geometry (defaults to _make_boundary())
-        morph : dict | None
-            Mock morphometric dict (defaults to _make_morph_dict())
-
-        Returns
-        -------
-        list
-            List of unittest.mock._patch context managers
-        """
-        if cg is None:
-            cg = _make_mock_cg()
-        if segment is None:
-            segment = _make_segment()
-        if boundary is None:
-            boundary = _make_boundary()
-        if morph is None:
-            morph = _make_morph_dict()
-
-        return [
-            patch(f"{_WS}.get_catchment_graph", return_value=cg),
-            patch(f"{_WS}.get_stream_info_by_segment_idx", return_value=segment),
-            patch(f"{_WS}.merge_catchment_boundaries", return_value=boundary),
-            patch(
-                f"{_WS}.get_segment_outlet",
-                return_value={"x": 639139.0, "y": 486706.0},
+def _use_area(mp: pytest.MonkeyPatch, area_km2: float) -> None:
+    """Re-patch the graph and morph dict for a watershed of ``area_km2``."""
+    apply_patches(
+        mp,
+        _ws_mod,
+        {
+            "get_catchment_graph": returning(_make_mock_cg(area_km2=area_km2)),
+            "build_morph_dict_from_graph": returning(
+                _make_morph_dict(area_km2=area_km2)
             ),
-            patch(f"{_WS}.build_morph_dict_from_graph", return_value=morph),
-            patch(f"{_WS}.get_main_stream_geojson", return_value=None),
-            patch(f"{_WS}.get_land_cover_for_boundary", return_value=None),
-        ]
+        },
+    )
+
+
+@pytest.fixture(scope="module")
+def happy_patches():
+    """
+    Build the happy-path replacements once per module.
+
+    The fake graph is shared by all tests; ``happy_path`` installs it.
+    """
+    return _patch_happy_path()
+
+
+@pytest.fixture(autouse=True)
+def happy_path(happy_patches, monkeypatch):
+    """
+    Install all happy-path replacements for the test.
+
+    Tests re-patch single functions on top; ``monkeypatch`` restores the
+    originals at teardown.
+    """
+    apply_patches(monkeypatch, _ws_mod, happy_patches)
+    return happy_patches
+
+
+class TestDelineateWatershedEndpoint:
+    """Tests for POST /api/delineate-watershed."""
 
     def test_success_returns_200(self, client):
         """Test successful delineation returns 200."""
-        with contextlib.ExitStack() as stack:
-            for p in self._patch_all():
-                stack.enter_context(p)
-
-            response = client.post(
-                "/api/delineate-watershed",
-                json={"latitude": 52.23, "longitude": 21.01},
-            )
+        response = client.post(
+            "/api/delineate-watershed",
+            json={"latitude": 52.23, "longitude": 21.01},
+        )
 
         assert response.status_code == 200
 
     def test_response_structure(self, client):
         """Test response has correct structure."""
-        with contextlib.ExitStack() as stack:
-            for p in self._patch_all():
-                stack.enter_context(p)
-
-            response = client.post(
-                "/api/delineate-watershed",
-                json={"latitude": 52.23, "longitude": 21.01},
-            )
+        response = client.post(
+            "/api/delineate-watershed",
+            json={"latitude": 52.23, "longitude": 21.01},
+        )
 
         data = response.json()
         assert "watershed" in data
@@ -202,14 +207,10 @@ class TestDelineateWatershedEndpoint:
 
     def test_outlet_info_structure(self, client):
         """Test outlet info has correct structure."""
-        with contextlib.ExitStack() as stack:
-            for p in self._patch_all():
-                stack.enter_context(p)
-
-            response = client.post(
-                "/api/delineate-watershed",
-                json={"latitude": 52.23, "longitude": 21.01},
-            )
+        response = client.post(
+            "/api/delineate-watershed",
+            json={"latitude": 52.23, "longitude": 21.01},
+        )
 
         data = response.json()
         outlet = data["watershed"]["outlet"]
@@ -220,14 +221,10 @@ class TestDelineateWatershedEndpoint:
 
     def test_boundary_is_valid_geojson(self, client):
         """Test that boundary is valid GeoJSON Feature with Polygon geometry."""
-        with contextlib.ExitStack() as stack:
-            for p in self._patch_all():
-                stack.enter_context(p)
-
-            response = client.post(
-                "/api/delineate-watershed",
-                json={"latitude": 52.23, "longitude": 21.01},
-            )
+        response = client.post(
+            "/api/delineate-watershed",
+            json={"latitude": 52.23, "longitude": 21.01},
+        )
 
         data = response.json()
         geojson = data["watershed"]["boundary_geojson"]
@@ -240,171 +237,117 @@ class TestDelineateWatershedEndpoint:
 
     def test_boundary_has_area_property(self, client):
         """Test that boundary GeoJSON has area_km2 property."""
-        with contextlib.ExitStack() as stack:
-            for p in self._patch_all():
-                stack.enter_context(p)
-
-            response = client.post(
-                "/api/delineate-watershed",
-                json={"latitude": 52.23, "longitude": 21.01},
-            )
-
-        data = response.json()
-        geojson = data["watershed"]["boundary_geojson"]
-
-        assert "area_km2" in geojson["properties"]
-
-    def test_no_stream_returns_404(self, client):
-        """Test that missing catchment returns 404 with Polish error message."""
-        cg = _make_mock_cg()
-        cg.find_catchment_at_point.side_effect = ValueError(
-            "Nie znaleziono zlewni cząstkowej"
-        )
-
-        patches = [
-            patch(f"{_WS}.get_catchment_graph", return_value=cg),
-        ]
-
-        with contextlib.ExitStack() as stack:
-            for p in patches:
-                stack.enter_context(p)
-
-            response = client.post(
-                "/api/delineate-watershed",
-                json={"latitude": 52.0, "longitude": 21.0},
-            )
-
-        assert response.status_code == 404
-        assert "Nie znaleziono zlewni" in response.json()["detail"]
-
-    def test_invalid_latitude_too_high_returns_422(self, client):
-        """Test that latitude > 90 returns 422."""
         response = client.post(
             "/api/delineate-watershed",
-            json={"latitude": 100.0, "longitude": 21.0},
+            json={"latitude": 52.23, "longitude": 21.01},
         )
 
-        assert response.status_code == 422
+        data = response.json()
+        geojson = data["watershed"]["boundary_geojson"]
 
-    def test_invalid_latitude_too_low_returns_422(self, client):
-        """Test that latitude < -90 returns 422."""
-        response = client.post(
-            "/api/delineate-watershed",
-            json={"latitude": -100.0, "longitude": 21.0},
-        )
+        assert "area_km2" in geojson["properties"]
 
-        assert response.status_code == 422
+    def test_boundary_simplified_for_display(self, client, monkeypatch):
+        """Test that redundant boundary vertices are dropped from the GeoJSON."""
+        # The 100 m square of _BOUNDARY with a vertex every 1 m along each edge
+        dense = MultiPolygon([_BOUNDARY.geoms[0].segmentize(1.0)])
+        monkeypatch.setattr(_ws_mod, "merge_catchment_boundaries", returning(dense))
 
-    def test_invalid_longitude_too_high_returns_422(self, client):
-        """Test that longitude > 180 returns 422."""
         response = client.post(
             "/api/delineate-watershed",
-            json={"latitude": 52.0, "longitude": 200.0},
+            json={"latitude": 52.23, "longitude": 21.01},
         )
 
-        assert response.status_code == 422
-
-    def test_invalid_longitude_too_low_returns_422(self, client):
-        """Test that longitude < -180 returns 422."""
-        response = client.post(
-            "/api/delineate-watershed",
-            json={"latitude": 52.0, "longitude": -200.0},
-        )
+        ring = response.json()["watershed"]["boundary_geojson"]["geometry"][
+            "coordinates"
+        ][0]
+        assert len(ring) == 5
 
-        assert response.status_code == 422
+    def test_no_stream_returns_404(self, client, monkeypatch):
+        """Test that missing catchment returns 404 with Polish error message."""
+        monkeypatch.setattr(_ws_mod, "get_catchment_graph", returning(NoCatchmentCG()))
 
-    def test_missing_latitude_returns_422(self, client):
-        """Test that missing latitude returns 422."""
         response = client.post(
             "/api/delineate-watershed",
-            json={"longitude": 21.0},
+            json={"latitude": 52.0, "longitude": 21.0},
         )
 
-        assert response.status_code == 422
+        assert response.status_code == 404
+        assert "Nie znaleziono zlewni" in response.json()["detail"]
 
-    def test_missing_longitude_returns_422(self, client):
-        """Test that missing longitude returns 422."""
-        response = client.post(
-            "/api/delineate-watershed",
-            json={"latitude": 52.0},
-        )
+    @pytest.mark.parametrize(
+        "payload",
+        [
+            {"latitude": 100.0, "longitude": 21.0},
+            {"latitude": -100.0, "longitude": 21.0},
+            {"latitude": 52.0, "longitude": 200.0},
+            {"latitude": 52.0, "longitude": -200.0},
+            {"longitude": 21.0},
+            {"latitude": 52.0},
+            {},
+        ],
+        ids=[
+            "latitude_too_high",
+            "latitude_too_low",
+            "longitude_too_high",
+            "longitude_too_low",
+            "missing_latitude",
+            "missing_longitude",
+            "empty_body",
+        ],
+    )
+    def test_invalid_payload_returns_422(self, client, payload):
+        """Test that out-of-range or missing coordinates return 422."""
+        response = client.post("/api/delineate-watershed", json=payload)
 
         assert response.status_code == 422
 
-    def test_empty_body_returns_422(self, client):
-        """Test that empty request body returns 422."""
+    def test_small_watershed_hydrograph_available(self, client):
+        """Test small watershed has hydrograph_available=True."""
         response = client.post(
             "/api/delineate-watershed",
-            json={},
+            json={"latitude": 52.23, "longitude": 21.01},
         )
 
-        assert response.status_code == 422
-
-    def test_small_watershed_hydrograph_available(self, client):
-        """Test small watershed has hydrograph_available=True."""
-        with contextlib.ExitStack() as stack:
-            for p in self._patch_all():
-                stack.enter_context(p)
-
-            response = client.post(
-                "/api/delineate-watershed",
-                json={"latitude": 52.23, "longitude": 21.01},
-            )
-
         data = response.json()
         assert data["watershed"]["hydrograph_available"] is True
 
-    def test_large_watershed_hydrograph_unavailable(self, client):
+    def test_large_watershed_hydrograph_unavailable(self, client, monkeypatch):
         """Test large watershed has hydrograph_available=False."""
         area_km2 = 300.0
-        cg = _make_mock_cg(area_km2=area_km2)
-        morph = _make_morph_dict(area_km2=area_km2)
-
-        with contextlib.ExitStack() as stack:
-            for p in self._patch_all(cg=cg, morph=morph):
-                stack.enter_context(p)
+        _use_area(monkeypatch, area_km2)
 
-            response = client.post(
-                "/api/delineate-watershed",
-                json={"latitude": 52.23, "longitude": 21.01},
-            )
+        response = client.post(
+            "/api/delineate-watershed",
+            json={"latitude": 52.23, "longitude": 21.01},
+        )
 
         data = response.json()
         assert data["watershed"]["hydrograph_available"] is False
         assert data["watershed"]["area_km2"] == 300.0
 
-    def test_area_calculation_correct(self, client):
+    def test_area_calculation_correct(self, client, monkeypatch):
         """Test that area_km2 matches the value from CatchmentGraph stats."""
         area_km2 = 45.67
-        cg = _make_mock_cg(area_km2=area_km2)
-        morph = _make_morph_dict(area_km2=area_km2)
-
-        with contextlib.ExitStack() as stack:
-            for p in self._patch_all(cg=cg, morph=morph):
-                stack.enter_context(p)
+        _use_area(monkeypatch, area_km2)
 
-            response = client.post(
-                "/api/delineate-watershed",
-                json={"latitude": 52.23, "longitude": 21.01},
-            )
+        response = client.post(
+            "/api/delineate-watershed",
+            json={"latitude": 52.23, "longitude": 21.01},
+        )
 
         data = response.json()
         assert data["watershed"]["area_km2"] == 45.67
 
-    def test_small_area_not_auto_selected(self, client):
+    def test_small_area_not_auto_selected(self, client, monkeypatch):
         """Test area ≤ 10000 m² (0.005 km²) is not auto-selected."""
         area_km2 = 0.005  # 5000 m² — below limit
-        cg = _make_mock_cg(area_km2=area_km2)
-        morph = _make_morph_dict(area_km2=area_km2)
+        _use_area(monkeypatch, area_km2)
 
-        with contextlib.ExitStack() as stack:
-            for p in self._patch_all(cg=cg, morph=morph):
-                stack.enter_context(p)
-
-            response = client.post(
-                "/api/delineate-watershed",
-                json={"latitude": 52.23, "longitude": 21.01},
-            )
+        response = client.post(
+            "/api/delineate-watershed",
+            json={"latitude": 52.23, "longitude": 21.01},
+        )
 
         data = response.json()
         assert data["auto_selected"] is False
@@ -412,20 +355,15 @@ class TestDelineateWatershedEndpoint:
         assert data["display_threshold_m2"] is None
         assert data["info_message"] is None
 
-    def test_large_area_auto_selected(self, client):
+    def test_large_area_auto_selected(self, client, monkeypatch):
         """Test area > 10000 m² (0.05 km²) triggers auto-selection."""
         area_km2 = 0.05  # 50000 m² — above limit
-        cg = _make_mock_cg(area_km2=area_km2)
-        morph = _make_morph_dict(area_km2=area_km2)
-
-        with contextlib.ExitStack() as stack:
-            for p in self._patch_all(cg=cg, morph=morph):
-                stack.enter_context(p)
+        _use_area(monkeypatch, area_km2)
 
-            response = client.post(
-                "/api/delineate-watershed",
-                json={"latitude": 52.23, "longitude": 21.01},
-            )
+        response = client.post(
+            "/api/delineate-watershed",
+            json={"latitude": 52.23, "longitude": 21.01},
+        )
 
         data = response.json()
         assert data["auto_selected"] is True
@@ -434,20 +372,15 @@ class TestDelineateWatershedEndpoint:
         assert data["display_threshold_m2"] is not None
         assert data["info_message"] is not None
 
-    def test_threshold_boundary_not_auto_selected(self, client):
+    def test_threshold_boundary_not_auto_selected(self, client, monkeypatch):
         """Test area exactly at 10000 m² (0.01 km²) is NOT auto-selected (≤ not <)."""
         area_km2 = 0.01  # exactly 10000 m²
-        cg = _make_mock_cg(area_km2=area_km2)
-        morph = _make_morph_dict(area_km2=area_km2)
-
-        with contextlib.ExitStack() as stack:
-            for p in self._patch_all(cg=cg, morph=morph):
-                stack.enter_context(p)
+        _use_area(monkeypatch, area_km2)
 
-            response = client.post(
-                "/api/delineate-watershed",
-                json={"latitude": 52.23, "longitude": 21.01},
-            )
+        response = client.post(
+            "/api/delineate-watershed",
+            json={"latitude": 52.23, "longitude": 21.01},
+        )
 
         data = response.json()
         assert data["auto_selected"] is False
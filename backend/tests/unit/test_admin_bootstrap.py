@@ -10,9 +10,13 @@ from fastapi.testclient import TestClient
 from api.dependencies.admin_auth import verify_admin_key
 from api.endpoints.admin import (
     _bootstrap_state,
+    _read_process_output,
     _validate_bbox,
     router,
 )
+from api.endpoints.tiles import clear_tile_cache
+from api.endpoints.tiles import router as tiles_router
+from core.database import get_db
 
 
 def _noop_auth():
@@ -243,3 +247,43 @@ class TestBootstrapStream:
         assert "data: line1" in body
         assert "data: line2" in body
         assert "event: done" in body
+
+
+class TestBootstrapTileCache:
+    """Tests that a finished bootstrap invalidates cached MVT tiles."""
+
+    @pytest.fixture(autouse=True)
+    def _cold_tile_cache(self):
+        clear_tile_cache()
+        yield
+        clear_tile_cache()
+
+    @pytest.mark.parametrize("returncode", [0, 1])
+    def test_finished_process_clears_tile_cache(self, app, returncode):
+        """After the pipeline exits (even failed), tiles are queried again."""
+        app.include_router(tiles_router, prefix="/api")
+        mock_db = MagicMock()
+        mock_db.execute.return_value.fetchone.return_value = (b"\x1a\x00",)
+        app.dependency_overrides[get_db] = lambda: mock_db
+
+        client = TestClient(app)
+        url = "/api/tiles/streams/10/550/340.pbf"
+        client.get(url)
+        client.get(url)
+        assert mock_db.execute.call_count == 1
+
+        mock_proc = MagicMock()
+        mock_proc.stdout = iter(["done\n"])
+        mock_proc.returncode = returncode
+        state = {
+            "process": mock_proc,
+            "status": "running",
+            "log_lines": [],
+            "started_at": None,
+            "params": None,
+            "history": [],
+        }
+        _read_process_output(mock_proc, state)
+
+        client.get(url)
+        assert mock_db.execute.call_count == 2
@@ -9,6 +9,8 @@ from sqlalchemy.orm import Session
 
 from api.dependencies.admin_auth import verify_admin_key
 from api.endpoints.admin import ALL_CLEANUP_TARGETS, _file_size_mb, router
+from api.endpoints.tiles import clear_tile_cache
+from api.endpoints.tiles import router as tiles_router
 from core.database import get_db
 
 
@@ -33,6 +35,11 @@ def _make_mock_db():
     return db
 
 
+def _tile_query_count(db) -> int:
+    """Count ST_AsMVT queries issued on ``db``."""
+    return sum("ST_AsMVT" in str(c.args[0]) for c in db.execute.call_args_list)
+
+
 class TestCleanupEstimate:
     """Tests for GET /api/admin/cleanup/estimate."""
 
@@ -194,6 +201,38 @@ class TestCleanupExecute:
         assert len(data["results"]) == 1
 
 
+class TestCleanupTileCache:
+    """Tests that a db_tables cleanup invalidates cached MVT tiles."""
+
+    @pytest.fixture(autouse=True)
+    def _cold_tile_cache(self):
+        clear_tile_cache()
+        yield
+        clear_tile_cache()
+
+    def test_db_cleanup_clears_tile_cache(self, app):
+        """The first tile request after TRUNCATE queries the database again."""
+        app.include_router(tiles_router, prefix="/api")
+        mock_db = _make_mock_db()
+        mock_db.execute.return_value.fetchone.return_value = (b"\x1a\x00",)
+        app.dependency_overrides[get_db] = lambda: mock_db
+
+        client = TestClient(app)
+        url = "/api/tiles/streams/10/550/340.pbf"
+        client.get(url)
+        client.get(url)
+        assert _tile_query_count(mock_db) == 1
+
+        response = client.post(
+            "/api/admin/cleanup",
+            json={"targets": ["db_tables"]},
+        )
+        assert response.json()["results"][0]["status"] == "ok"
+
+        client.get(url)
+        assert _tile_query_count(mock_db) == 2
+
+
 class TestCleanupCache:
     """Tests for cache cleanup target."""
 
@@ -5,32 +5,29 @@ Verifies that when cascade escalation occurs (>500 segments triggers
 coarser threshold), both boundary AND stats use the escalated threshold.
 """
 
+from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
 import numpy as np
 import pytest
-from fastapi.testclient import TestClient
 from shapely.geometry import MultiPolygon, Polygon
 
 from api.main import app
 from core.database import get_db
-
-
-@pytest.fixture
-def client():
-    """Create test client."""
-    return TestClient(app)
+from tests.fakes import EMPTY_RESULT, FakeResult, FakeSession
 
 
 def _make_boundary_wkb():
     """Create a simple boundary WKB for mocking merge_catchment_boundaries."""
-    poly = Polygon([
-        (639100, 486650),
-        (639200, 486650),
-        (639200, 486750),
-        (639100, 486750),
-        (639100, 486650),
-    ])
+    poly = Polygon(
+        [
+            (639100, 486650),
+            (639200, 486650),
+            (639200, 486750),
+            (639100, 486750),
+            (639100, 486650),
+        ]
+    )
     return MultiPolygon([poly])
 
 
@@ -86,14 +83,14 @@ def _make_mock_cg_with_cascade():
 
     # traverse_upstream -> fine indices (600 items)
     cg.traverse_upstream.side_effect = [
-        fine_upstream,       # First call: fine threshold BFS
-        coarse_upstream,     # Second call: coarse threshold BFS (during cascade)
+        fine_upstream,  # First call: fine threshold BFS
+        coarse_upstream,  # Second call: coarse threshold BFS (during cascade)
     ]
 
     # get_segment_indices: maps indices to segment_idxs
     cg.get_segment_indices.side_effect = [
-        fine_segment_idxs,     # First call: fine -> 600 segments
-        coarse_segment_idxs,   # Second call: coarse -> 50 segments
+        fine_segment_idxs,  # First call: fine -> 600 segments
+        coarse_segment_idxs,  # Second call: coarse -> 50 segments
     ]
 
     # aggregate_stats: different results for fine vs coarse
@@ -121,62 +118,48 @@ def _make_mock_cg_with_cascade():
     return cg, fine_stats, coarse_stats
 
 
-def _make_mock_db():
-    """Create a mock DB session for endpoint tests."""
-    mock_session = MagicMock()
-
-    segment_result = MagicMock()
-    segment_result.segment_idx = 1
-    segment_result.strahler_order = 3
-    segment_result.length_m = 5000.0
-    segment_result.upstream_area_km2 = 100.0
-    segment_result.downstream_x = 639139.0
-    segment_result.downstream_y = 486706.0
-
-    catchment_result = MagicMock()
-    catchment_result.segment_idx = 1
-
-    boundary = _make_boundary_wkb()
-    boundary_result = MagicMock()
-    boundary_result.geom = boundary.wkb
-
-    outlet_result = MagicMock()
-    outlet_result.x = 639139.0
-    outlet_result.y = 486706.0
+# FakeSession dispatch table for the endpoints' queries
+_DISPATCH = (
+    (("ST_ClosestPoint",), EMPTY_RESULT),
+    (
+        ("stream_network", "ST_DWithin"),
+        FakeResult(
+            SimpleNamespace(
+                segment_idx=1,
+                strahler_order=3,
+                length_m=5000.0,
+                upstream_area_km2=100.0,
+                downstream_x=639139.0,
+                downstream_y=486706.0,
+            )
+        ),
+    ),
+    (("ST_Contains", "stream_catchments"), FakeResult(SimpleNamespace(segment_idx=1))),
+    (("ST_UnaryUnion",), FakeResult(SimpleNamespace(geom=_make_boundary_wkb().wkb))),
+    (("ST_EndPoint",), FakeResult(SimpleNamespace(x=639139.0, y=486706.0))),
+    (
+        ("ST_AsGeoJSON",),
+        FakeResult(
+            SimpleNamespace(
+                geojson=(
+                    '{"type":"LineString","coordinates":[[21.01,52.23],[21.02,52.24]]}'
+                )
+            )
+        ),
+    ),
+)
 
-    stream_geojson_result = MagicMock()
-    stream_geojson_result.geojson = (
-        '{"type":"LineString","coordinates":[[21.01,52.23],[21.02,52.24]]}'
-    )
 
-    def execute_side_effect(query, params=None):
-        result = MagicMock()
-        query_str = str(query)
-
-        if "ST_ClosestPoint" in query_str:
-            result.fetchone.return_value = None
-        elif "stream_network" in query_str and "ST_DWithin" in query_str:
-            result.fetchone.return_value = segment_result
-        elif "ST_Contains" in query_str and "stream_catchments" in query_str:
-            result.fetchone.return_value = catchment_result
-        elif "ST_UnaryUnion" in query_str:
-            result.fetchone.return_value = boundary_result
-        elif "ST_EndPoint" in query_str:
-            result.fetchone.return_value = outlet_result
-        elif "ST_AsGeoJSON" in query_str:
-            result.fetchone.return_value = stream_geojson_result
-        elif "land_cover" in query_str or "soil_hsg" in query_str or "hsg" in query_str:
-            result.fetchall.return_value = []
-            result.fetchone.return_value = None
-        else:
-            result.fetchone.return_value = None
-            result.fetchall.return_value = []
-        return result
-
-    mock_session.execute.side_effect = execute_side_effect
-    return mock_session
+@pytest.fixture
+def cascade_db():
+    """Serve ``get_db`` from the cascade DB stub; overrides are reset afterwards."""
+    db = FakeSession(_DISPATCH)
+    app.dependency_overrides[get_db] = lambda: db
+    yield db
+    app.dependency_overrides.clear()
 
 
+@pytest.mark.usefixtures("cascade_db")
 class TestSelectStreamCascadeStats:
     """Tests for select_stream cascade stats consistency (CR9)."""
 
@@ -186,38 +169,43 @@ class TestSelectStreamCascadeStats:
         Verify that aggregate_stats is called with the coarser upstream_indices.
         """
         cg, fine_stats, coarse_stats = _make_mock_cg_with_cascade()
-        mock_db = _make_mock_db()
-
-        with patch(
-            "api.endpoints.select_stream.get_catchment_graph",
-            return_value=cg,
-        ), patch(
-            "api.endpoints.select_stream.find_nearest_stream_segment_hybrid",
-            return_value={"segment_idx": 1},
-        ), patch(
-            "api.endpoints.select_stream.merge_catchment_boundaries",
-            return_value=_make_boundary_wkb(),
-        ), patch(
-            "api.endpoints.select_stream.get_stream_info_by_segment_idx",
-            return_value={
-                "strahler_order": 3,
-                "length_m": 5000.0,
-                "upstream_area_km2": 100.0,
-                "downstream_x": 639139.0,
-                "downstream_y": 486706.0,
-            },
-        ), patch(
-            "api.endpoints.select_stream.get_segment_outlet",
-            return_value={"x": 639139.0, "y": 486706.0},
-        ), patch(
-            "api.endpoints.select_stream.get_main_stream_geojson",
-            return_value=None,
-        ), patch(
-            "api.endpoints.select_stream.get_land_cover_for_boundary",
-            return_value=None,
-        ):
-            app.dependency_overrides[get_db] = lambda: mock_db
 
+        with (
+            patch(
+                "api.endpoints.select_stream.get_catchment_graph",
+                return_value=cg,
+            ),
+            patch(
+                "api.endpoints.select_stream.find_nearest_stream_segment_hybrid",
+                return_value={"segment_idx": 1},
+            ),
+            patch(
+                "api.endpoints.select_stream.merge_catchment_boundaries",
+                return_value=_make_boundary_wkb(),
+            ),
+            patch(
+                "api.endpoints.select_stream.get_stream_info_by_segment_idx",
+                return_value={
+                    "strahler_order": 3,
+                    "length_m": 5000.0,
+                    "upstream_area_km2": 100.0,
+                    "downstream_x": 639139.0,
+                    "downstream_y": 486706.0,
+                },
+            ),
+            patch(
+                "api.endpoints.select_stream.get_segment_outlet",
+                return_value={"x": 639139.0, "y": 486706.0},
+            ),
+            patch(
+                "api.endpoints.select_stream.get_main_stream_geojson",
+                return_value=None,
+            ),
+            patch(
+                "api.endpoints.select_stream.get_land_cover_for_boundary",
+                return_value=None,
+            ),
+        ):
             response = client.post(
                 "/api/select-stream",
                 json={
@@ -244,8 +232,6 @@ class TestSelectStreamCascadeStats:
             assert len(first_call_indices) == 600
             assert len(second_call_indices) == 50
 
-            app.dependency_overrides.clear()
-
     def test_no_cascade_stats_unchanged(self, client):
         """
         When BFS returns <=500 segments, no cascade occurs.
@@ -281,38 +267,42 @@ class TestSelectStreamCascadeStats:
         }
         cg.aggregate_hypsometric.return_value = []
 
-        mock_db = _make_mock_db()
-
-        with patch(
-            "api.endpoints.select_stream.get_catchment_graph",
-            return_value=cg,
-        ), patch(
-            "api.endpoints.select_stream.find_nearest_stream_segment_hybrid",
-            return_value={"segment_idx": 1},
-        ), patch(
-            "api.endpoints.select_stream.merge_catchment_boundaries",
-            return_value=_make_boundary_wkb(),
-        ), patch(
-            "api.endpoints.select_stream.get_stream_info_by_segment_idx",
-            return_value={
-                "strahler_order": 3,
-                "length_m": 5000.0,
-                "upstream_area_km2": 25.0,
-                "downstream_x": 639139.0,
-                "downstream_y": 486706.0,
-            },
-        ), patch(
-            "api.endpoints.select_stream.get_segment_outlet",
-            return_value={"x": 639139.0, "y": 486706.0},
-        ), patch(
-            "api.endpoints.select_stream.get_main_stream_geojson",
-            return_value=None,
-        ), patch(
-            "api.endpoints.select_stream.get_land_cover_for_boundary",
-            return_value=None,
+        with (
+            patch(
+                "api.endpoints.select_stream.get_catchment_graph",
+                return_value=cg,
+            ),
+            patch(
+                "api.endpoints.select_stream.find_nearest_stream_segment_hybrid",
+                return_value={"segment_idx": 1},
+            ),
+            patch(
+                "api.endpoints.select_stream.merge_catchment_boundaries",
+                return_value=_make_boundary_wkb(),
+            ),
+            patch(
+                "api.endpoints.select_stream.get_stream_info_by_segment_idx",
+                return_value={
+                    "strahler_order": 3,
+                    "length_m": 5000.0,
+                    "upstream_area_km2": 25.0,
+                    "downstream_x": 639139.0,
+                    "downstream_y": 486706.0,
+                },
+            ),
+            patch(
+                "api.endpoints.select_stream.get_segment_outlet",
+                return_value={"x": 639139.0, "y": 486706.0},
+            ),
+            patch(
+                "api.endpoints.select_stream.get_main_stream_geojson",
+                return_value=None,
+            ),
+            patch(
+                "api.endpoints.select_stream.get_land_cover_for_boundary",
+                return_value=None,
+            ),
         ):
-            app.dependency_overrides[get_db] = lambda: mock_db
-
             response = client.post(
                 "/api/select-stream",
                 json={
@@ -331,46 +321,49 @@ class TestSelectStreamCascadeStats:
             # aggregate_stats called only once (no re-aggregation)
             assert cg.aggregate_stats.call_count == 1
 
-            app.dependency_overrides.clear()
-
     def test_cascade_hypsometric_uses_escalated_indices(self, client):
         """
         After cascade, aggregate_hypsometric should also use
         the escalated upstream_indices, not the fine ones.
         """
         cg, fine_stats, coarse_stats = _make_mock_cg_with_cascade()
-        mock_db = _make_mock_db()
-
-        with patch(
-            "api.endpoints.select_stream.get_catchment_graph",
-            return_value=cg,
-        ), patch(
-            "api.endpoints.select_stream.find_nearest_stream_segment_hybrid",
-            return_value={"segment_idx": 1},
-        ), patch(
-            "api.endpoints.select_stream.merge_catchment_boundaries",
-            return_value=_make_boundary_wkb(),
-        ), patch(
-            "api.endpoints.select_stream.get_stream_info_by_segment_idx",
-            return_value={
-                "strahler_order": 3,
-                "length_m": 5000.0,
-                "upstream_area_km2": 100.0,
-                "downstream_x": 639139.0,
-                "downstream_y": 486706.0,
-            },
-        ), patch(
-            "api.endpoints.select_stream.get_segment_outlet",
-            return_value={"x": 639139.0, "y": 486706.0},
-        ), patch(
-            "api.endpoints.select_stream.get_main_stream_geojson",
-            return_value=None,
-        ), patch(
-            "api.endpoints.select_stream.get_land_cover_for_boundary",
-            return_value=None,
-        ):
-            app.dependency_overrides[get_db] = lambda: mock_db
 
+        with (
+            patch(
+                "api.endpoints.select_stream.get_catchment_graph",
+                return_value=cg,
+            ),
+            patch(
+                "api.endpoints.select_stream.find_nearest_stream_segment_hybrid",
+                return_value={"segment_idx": 1},
+            ),
+            patch(
+                "api.endpoints.select_stream.merge_catchment_boundaries",
+                return_value=_make_boundary_wkb(),
+            ),
+            patch(
+                "api.endpoints.select_stream.get_stream_info_by_segment_idx",
+                return_value={
+                    "strahler_order": 3,
+                    "length_m": 5000.0,
+                    "upstream_area_km2": 100.0,
+                    "downstream_x": 639139.0,
+                    "downstream_y": 486706.0,
+                },
+            ),
+            patch(
+                "api.endpoints.select_stream.get_segment_outlet",
+                return_value={"x": 639139.0, "y": 486706.0},
+            ),
+            patch(
+                "api.endpoints.select_stream.get_main_stream_geojson",
+                return_value=None,
+            ),
+            patch(
+                "api.endpoints.select_stream.get_land_cover_for_boundary",
+                return_value=None,
+            ),
+        ):
             response = client.post(
                 "/api/select-stream",
                 json={
@@ -392,9 +385,8 @@ class TestSelectStreamCascadeStats:
             trace_indices = cg.trace_main_channel.call_args[0][1]
             assert len(trace_indices) == 50
 
-            app.dependency_overrides.clear()
-
 
+@pytest.mark.usefixtures("cascade_db")
 class TestWatershedCascadeStats:
     """Tests for watershed delineation cascade stats consistency (CR9)."""
 
@@ -439,56 +431,60 @@ class TestWatershedCascadeStats:
         cg.aggregate_stats.side_effect = _aggregate_stats
         cg.aggregate_hypsometric.return_value = []
 
-        mock_db = _make_mock_db()
-
-        with patch(
-            "api.endpoints.watershed.get_catchment_graph",
-            return_value=cg,
-        ), patch(
-            "api.endpoints.watershed.get_stream_info_by_segment_idx",
-            return_value={
-                "downstream_x": 639139.0,
-                "downstream_y": 486706.0,
-            },
-        ), patch(
-            "api.endpoints.watershed.merge_catchment_boundaries",
-            return_value=_make_boundary_wkb(),
-        ), patch(
-            "api.endpoints.watershed.get_segment_outlet",
-            return_value={"x": 639139.0, "y": 486706.0},
-        ), patch(
-            "api.endpoints.watershed.get_main_stream_geojson",
-            return_value=None,
-        ), patch(
-            "api.endpoints.watershed.get_land_cover_for_boundary",
-            return_value=None,
-        ), patch(
-            "api.endpoints.watershed.build_morph_dict_from_graph",
-            return_value={
-                "area_km2": 105.0,
-                "perimeter_km": 50.0,
-                "length_km": 20.0,
-                "elevation_min_m": 95.0,
-                "elevation_max_m": 310.0,
-                "elevation_mean_m": 202.0,
-                "mean_slope_m_per_m": 0.048,
-                "channel_length_km": 15.0,
-                "channel_slope_m_per_m": 0.003,
-                "compactness_coefficient": 1.4,
-                "circularity_ratio": 0.5,
-                "elongation_ratio": 0.6,
-                "form_factor": 0.3,
-                "mean_width_km": 5.0,
-                "relief_ratio": 0.01,
-                "hypsometric_integral": 0.45,
-                "drainage_density_km_per_km2": 1.8,
-                "stream_frequency_per_km2": 1.3,
-                "ruggedness_number": 0.4,
-                "max_strahler_order": 4,
-            },
-        ) as mock_morph:
-            app.dependency_overrides[get_db] = lambda: mock_db
-
+        with (
+            patch(
+                "api.endpoints.watershed.get_catchment_graph",
+                return_value=cg,
+            ),
+            patch(
+                "api.endpoints.watershed.get_stream_info_by_segment_idx",
+                return_value={
+                    "downstream_x": 639139.0,
+                    "downstream_y": 486706.0,
+                },
+            ),
+            patch(
+                "api.endpoints.watershed.merge_catchment_boundaries",
+                return_value=_make_boundary_wkb(),
+            ),
+            patch(
+                "api.endpoints.watershed.get_segment_outlet",
+                return_value={"x": 639139.0, "y": 486706.0},
+            ),
+            patch(
+                "api.endpoints.watershed.get_main_stream_geojson",
+                return_value=None,
+            ),
+            patch(
+                "api.endpoints.watershed.get_land_cover_for_boundary",
+                return_value=None,
+            ),
+            patch(
+                "api.endpoints.watershed.build_morph_dict_from_graph",
+                return_value={
+                    "area_km2": 105.0,
+                    "perimeter_km": 50.0,
+                    "length_km": 20.0,
+                    "elevation_min_m": 95.0,
+                    "elevation_max_m": 310.0,
+                    "elevation_mean_m": 202.0,
+                    "mean_slope_m_per_m": 0.048,
+                    "channel_length_km": 15.0,
+                    "channel_slope_m_per_m": 0.003,
+                    "compactness_coefficient": 1.4,
+                    "circularity_ratio": 0.5,
+                    "elongation_ratio": 0.6,
+                    "form_factor": 0.3,
+                    "mean_width_km": 5.0,
+                    "relief_ratio": 0.01,
+                    "hypsometric_integral": 0.45,
+                    "drainage_density_km_per_km2": 1.8,
+                    "stream_frequency_per_km2": 1.3,
+                    "ruggedness_number": 0.4,
+                    "max_strahler_order": 4,
+                },
+            ) as mock_morph,
+        ):
             response = client.post(
                 "/api/delineate-watershed",
                 json={
@@ -512,5 +508,3 @@ class TestWatershedCascadeStats:
             morph_call_args = mock_morph.call_args
             morph_upstream_indices = morph_call_args[0][1]  # 2nd positional arg
             assert len(morph_upstream_indices) == 50
-
-            app.dependency_overrides.clear()
@@ -8,12 +8,74 @@ from scipy import sparse
 
 from core.catchment_graph import CatchmentGraph
 
-
-@pytest.fixture
+# Arrays of the 4-node test graph, built once at import; small_graph
+# only assigns them (the graph's query methods never write to them)
+# Node 0: seg_idx=1, upstream of 3
+# Node 1: seg_idx=2, upstream of 3
+# Node 2: seg_idx=3, upstream of 4
+# Node 3: seg_idx=4, outlet
+_SEG_IDX = np.array([1, 2, 3, 4], dtype=np.int32)
+_THRESHOLD = np.array([10000, 10000, 10000, 10000], dtype=np.int32)
+_AREA = np.array([5.0, 3.0, 8.0, 10.0], dtype=np.float32)
+_ELEV_MIN = np.array([150.0, 160.0, 140.0, 120.0], dtype=np.float32)
+_ELEV_MAX = np.array([200.0, 210.0, 195.0, 180.0], dtype=np.float32)
+_ELEV_MEAN = np.array([175.0, 185.0, 167.5, 150.0], dtype=np.float32)
+_SLOPE = np.array([5.0, 6.0, 4.0, 3.0], dtype=np.float32)
+_PERIM = np.array([10.0, 8.0, 15.0, 20.0], dtype=np.float32)
+_STREAM_LEN = np.array([2.0, 1.5, 3.0, 4.0], dtype=np.float32)
+_STRAHLER = np.array([1, 1, 2, 3], dtype=np.int8)
+# Shared by every test, so make accidental in-place writes fail loudly
+for _arr in (
+    _SEG_IDX,
+    _THRESHOLD,
+    _AREA,
+    _ELEV_MIN,
+    _ELEV_MAX,
+    _ELEV_MEAN,
+    _SLOPE,
+    _PERIM,
+    _STREAM_LEN,
+    _STRAHLER,
+):
+    _arr.setflags(write=False)
+
+_HISTOGRAMS = [
+    {"base_m": 150, "interval_m": 1, "counts": [10, 20, 30, 20, 10, 5, 3, 2]},
+    {"base_m": 160, "interval_m": 1, "counts": [5, 15, 25, 15, 5]},
+    {"base_m": 140, "interval_m": 1, "counts": [8, 12, 18, 22, 18, 12, 8]},
+    {
+        "base_m": 120,
+        "interval_m": 1,
+        "counts": [3, 5, 10, 15, 20, 25, 20, 15, 10, 5, 3],
+    },
+]
+_LOOKUP = {
+    (10000, 1): 0,
+    (10000, 2): 1,
+    (10000, 3): 2,
+    (10000, 4): 3,
+}
+
+# Upstream adjacency: adj[downstream, upstream] = 1
+# 1→3: edge (0, 2), 2→3: edge (1, 2), 3→4: edge (2, 3)
+_UPSTREAM_ADJ = sparse.csr_matrix(
+    (
+        np.ones(3, dtype=np.int8),
+        (np.array([2, 2, 3], dtype=np.int32), np.array([0, 1, 2], dtype=np.int32)),
+    ),
+    shape=(4, 4),
+    dtype=np.int8,
+)
+
+
+@pytest.fixture(scope="module")
 def small_graph():
     """
     Build a small hand-crafted catchment graph for testing.
 
+    Module-scoped: the query methods only read graph state. A test that
+    needs to change the graph must work on a ``copy.copy`` of it.
+
     Graph structure (threshold=10000):
         1 → 3
         2 → 3
@@ -23,55 +85,22 @@ def small_graph():
     4 catchments, each with pre-computed stats.
     """
     cg = CatchmentGraph()
-    n = 4
-    cg._n = n
+    cg._n = 4
     cg._loaded = True
 
-    # Node 0: seg_idx=1, upstream of 3
-    # Node 1: seg_idx=2, upstream of 3
-    # Node 2: seg_idx=3, upstream of 4
-    # Node 3: seg_idx=4, outlet
-    cg._segment_idx = np.array([1, 2, 3, 4], dtype=np.int32)
-    cg._threshold_m2 = np.array([10000, 10000, 10000, 10000], dtype=np.int32)
-    cg._area_km2 = np.array([5.0, 3.0, 8.0, 10.0], dtype=np.float32)
-    cg._elev_min = np.array([150.0, 160.0, 140.0, 120.0], dtype=np.float32)
-    cg._elev_max = np.array([200.0, 210.0, 195.0, 180.0], dtype=np.float32)
-    cg._elev_mean = np.array([175.0, 185.0, 167.5, 150.0], dtype=np.float32)
-    cg._slope_mean = np.array([5.0, 6.0, 4.0, 3.0], dtype=np.float32)
-    cg._perimeter_km = np.array([10.0, 8.0, 15.0, 20.0], dtype=np.float32)
-    cg._stream_length_km = np.array([2.0, 1.5, 3.0, 4.0], dtype=np.float32)
-    cg._strahler = np.array([1, 1, 2, 3], dtype=np.int8)
-
-    # Histograms
-    cg._histograms = [
-        {"base_m": 150, "interval_m": 1, "counts": [10, 20, 30, 20, 10, 5, 3, 2]},
-        {"base_m": 160, "interval_m": 1, "counts": [5, 15, 25, 15, 5]},
-        {"base_m": 140, "interval_m": 1, "counts": [8, 12, 18, 22, 18, 12, 8]},
-        {
-            "base_m": 120,
-            "interval_m": 1,
-            "counts": [3, 5, 10, 15, 20, 25, 20, 15, 10, 5, 3],
-        },
-    ]
-
-    # Lookup
-    cg._lookup = {
-        (10000, 1): 0,
-        (10000, 2): 1,
-        (10000, 3): 2,
-        (10000, 4): 3,
-    }
-
-    # Upstream adjacency: adj[downstream, upstream] = 1
-    # 1→3: edge (0, 2), 2→3: edge (1, 2), 3→4: edge (2, 3)
-    row = np.array([2, 2, 3], dtype=np.int32)
-    col = np.array([0, 1, 2], dtype=np.int32)
-    data = np.ones(3, dtype=np.int8)
-    cg._upstream_adj = sparse.csr_matrix(
-        (data, (row, col)),
-        shape=(n, n),
-        dtype=np.int8,
-    )
+    cg._segment_idx = _SEG_IDX
+    cg._threshold_m2 = _THRESHOLD
+    cg._area_km2 = _AREA
+    cg._elev_min = _ELEV_MIN
+    cg._elev_max = _ELEV_MAX
+    cg._elev_mean = _ELEV_MEAN
+    cg._slope_mean = _SLOPE
+    cg._perimeter_km = _PERIM
+    cg._stream_length_km = _STREAM_LEN
+    cg._strahler = _STRAHLER
+    cg._histograms = _HISTOGRAMS
+    cg._lookup = _LOOKUP
+    cg._upstream_adj = _UPSTREAM_ADJ
 
     return cg
 
@@ -430,6 +459,7 @@ class TestGetCatchmentGraphThreadSafety:
         import threading
 
         from core.catchment_graph import _catchment_graph_lock
+
         assert isinstance(_catchment_graph_lock, threading.Lock)
 
 
@@ -441,12 +471,11 @@ class TestTraverseToConfluenceDeque:
         import inspect
 
         from core.catchment_graph import CatchmentGraph
+
         source = inspect.getsource(
             CatchmentGraph.traverse_to_confluence,
         )
-        assert "deque" in source, (
-            "traverse_to_confluence should use collections.deque"
-        )
+        assert "deque" in source, "traverse_to_confluence should use collections.deque"
         assert ".pop(0)" not in source, (
             "traverse_to_confluence should not use list.pop(0)"
         )
@@ -469,6 +498,7 @@ class TestGetSegmentIdx:
         import pytest
 
         from core.catchment_graph import CatchmentGraph
+
         cg = CatchmentGraph()
         with pytest.raises(RuntimeError, match="not loaded"):
             cg.get_segment_idx(0)
@@ -7,6 +7,8 @@ and PL-1992 (EPSG:2180) coordinate reference systems.
 
 from typing import Any
 
+import numpy as np
+import shapely
 from pyproj import Transformer
 from shapely.geometry import Point, Polygon, mapping
 
@@ -127,17 +129,13 @@ def transform_polygon_pl1992_to_wgs84(polygon: Polygon) -> Polygon:
     """
     transformer = _get_transformer_pl1992_to_wgs84()
 
-    def transform_coords(coords: list) -> list:
-        """Transform list of coordinate tuples."""
-        return [transformer.transform(x, y) for x, y in coords]
+    def transform_coords(xy: np.ndarray) -> np.ndarray:
+        """Transform an (N, 2) coordinate array in one PyProj call."""
+        lon, lat = transformer.transform(xy[:, 0], xy[:, 1])
+        return np.column_stack((lon, lat))
 
-    # Transform exterior ring
-    exterior = transform_coords(polygon.exterior.coords)
-
-    # Transform interior rings (holes)
-    interiors = [transform_coords(ring.coords) for ring in polygon.interiors]
-
-    return Polygon(exterior, interiors)
+    # All rings (exterior + holes) in a single vectorized pass
+    return shapely.transform(polygon, transform_coords)
 
 
 def polygon_to_geojson_feature(